@@ -0,0 +1,117 @@
+"""
+Benchmark — bytes on the wire for generated audio: bare static mount vs. the media router.
+
+Both sides are measured: the old serving path is a Starlette StaticFiles mount over a
+directory holding the same files (it already answers If-None-Match with 304 and honours
+Range), the new one is the media router. Scenarios cover common mobile playback patterns:
+  * first download of an answer
+  * replay of an already-downloaded answer (conditional GET → 304)
+  * resume after a dropped connection at 60% (Range request for the rest)
+  * seek to the last 25% of an answer (Range request)
+  * WAV answer with a precompressed .gz variant
+
+Byte savings come only from the precompressed variant. The router's other gain is
+`immutable` caching: browsers skip the revalidation request entirely, which a byte
+count cannot show — compare the Cache-Control lines printed at the end.
+
+Run from the backend directory:  python -m benchmarks.bench_audio_serving
+"""
+import os
+import sys
+import gzip
+import shutil
+import hashlib
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.gettempdir()}/janaccess_bench.db")
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.staticfiles import StaticFiles  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+from services import speech_service, tts_backends  # noqa: E402
+from services.storage import get_storage  # noqa: E402
+
+
+def _wire_bytes(response) -> int:
+    """Body bytes actually transferred (compressed size when Content-Encoding is set)."""
+    if "content-encoding" in response.headers:
+        return int(response.headers["content-length"])
+    return len(response.content)
+
+
+def _playback(client: TestClient, url: str, accept_encoding: str = "identity") -> list:
+    """Run the playback scenarios against one server; returns [(label, bytes, status)]."""
+    first = client.get(url, headers={"Accept-Encoding": accept_encoding})
+    etag = first.headers.get("etag", "")
+    size = len(first.content)
+    results = [("First download", _wire_bytes(first), first.status_code)]
+
+    replay = client.get(url, headers={"If-None-Match": etag, "Accept-Encoding": accept_encoding})
+    results.append(("Replay (If-None-Match)", _wire_bytes(replay), replay.status_code))
+
+    resume = client.get(url, headers={"Range": f"bytes={int(size * 0.6)}-", "If-Range": etag})
+    results.append(("Resume at 60% (Range)", _wire_bytes(resume), resume.status_code))
+
+    seek = client.get(url, headers={"Range": f"bytes={int(size * 0.75)}-"})
+    results.append(("Seek to last 25% (Range)", _wire_bytes(seek), seek.status_code))
+    return results
+
+
+def run():
+    storage = get_storage()
+
+    # A realistic 120 KB MP3 answer and a stub-backend WAV answer with a gzip variant
+    mp3 = os.urandom(120 * 1024)
+    wav = tts_backends.StubBackend().synthesize("Namaste. " * 400, "hi")
+    files = {
+        f"{hashlib.sha256(mp3).hexdigest()}.mp3": mp3,
+        f"{hashlib.sha256(wav).hexdigest()}.wav": wav,
+    }
+    mp3_name, wav_name = files
+    files[wav_name + ".gz"] = gzip.compress(wav, 9)
+
+    # Old path: a bare StaticFiles mount over the same files
+    static_root = tempfile.mkdtemp()
+    os.makedirs(os.path.join(static_root, "audio"))
+    static_app = FastAPI()
+    static_app.mount("/static", StaticFiles(directory=static_root), name="static")
+
+    for name, data in files.items():
+        storage.put(speech_service.audio_key(name), data, "audio/wav" if ".wav" in name else "audio/mpeg")
+        with open(os.path.join(static_root, "audio", name), "wb") as f:
+            f.write(data)
+
+    mounts = {"Static mount": TestClient(static_app), "Media router": TestClient(main.app)}
+    try:
+        measured = {
+            label: _playback(client, f"/static/audio/{mp3_name}")
+            + [("WAV, client accepts gzip", *_playback(client, f"/static/audio/{wav_name}", "gzip")[0][1:])]
+            for label, client in mounts.items()
+        }
+
+        print(f"{'Scenario':<28}{'Static mount':>14}{'Media router':>14}{'Saved':>8}  Status")
+        print("-" * 78)
+        total_before = total_after = 0
+        for (label, before, before_status), (_, after, after_status) in zip(*measured.values()):
+            total_before += before
+            total_after += after
+            saved = 100 * (1 - after / before) if before else 0.0
+            print(f"{label:<28}{before:>14,}{after:>14,}{saved:>7.1f}%  {before_status} / {after_status}")
+        print("-" * 78)
+        print(f"{'Total':<28}{total_before:>14,}{total_after:>14,}{100 * (1 - total_after / total_before):>7.1f}%")
+
+        for label, client in mounts.items():
+            cache_control = client.get(f"/static/audio/{mp3_name}").headers.get("cache-control", "(none)")
+            print(f"\n{label} Cache-Control: {cache_control}")
+    finally:
+        shutil.rmtree(static_root, ignore_errors=True)
+        for name in files:
+            storage.delete(speech_service.audio_key(name))
+
+
+if __name__ == "__main__":
+    run()
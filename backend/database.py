@@ -4,7 +4,7 @@ Uses SQLite for demo, ready for PostgreSQL migration.
 """
 import os
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 load_dotenv()
@@ -36,3 +36,23 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def add_missing_columns():
+    """
+    Add columns (and their indexes) that exist on the models but not yet in the database.
+    create_all() only creates missing tables, so this keeps existing databases usable
+    when a model gains a nullable column.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    col_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}"))
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
@@ -3,7 +3,6 @@ JanAccess AI — FastAPI Application Entry Point.
 A voice-first civic intelligence assistant.
 """
 import os
-from pathlib import Path
 from dotenv import load_dotenv
 
 # Load environment variables before anything else
@@ -12,16 +11,21 @@ load_dotenv()
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from routers import assistant, eligibility, document, skills, analytics
-from database import engine, Base
+from routers import assistant, eligibility, document, skills, analytics, media, schemes
+from database import engine, Base, SessionLocal, add_missing_columns
+from services import storage, analytics_service, stream_analytics, retention_service, search_service, document_jobs
 
-# Create database tables
+# Create database tables (and columns added to existing tables)
 Base.metadata.create_all(bind=engine)
+add_missing_columns()
+search_service.ensure_search_index(engine)
 
-# Ensure static directories exist
-Path("static/audio").mkdir(parents=True, exist_ok=True)
-Path("static/uploads").mkdir(parents=True, exist_ok=True)
-Path("static/documents").mkdir(parents=True, exist_ok=True)
+# Backfill analytics rollups and scheme matches for databases that predate them,
+# and fail background document jobs whose process stopped (no heartbeat)
+with SessionLocal() as _db:
+    analytics_service.ensure_rollups(_db)
+    analytics_service.backfill_scheme_matches(_db)
+    document_jobs.fail_interrupted_jobs(_db)
 
 app = FastAPI(
     title="JanAccess AI API",
@@ -31,10 +35,28 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
-# Mount Static Files for audio/document serving (only if directory exists)
-import os as _os
-if _os.path.exists("static"):
-    app.mount("/static", StaticFiles(directory="static"), name="static")
+@app.on_event("startup")
+async def _start_retention():
+    """Compact and archive old interaction logs in the background."""
+    retention_service.start()
+
+
+@app.on_event("shutdown")
+def _snapshot_analytics():
+    """Persist the live analytics sketches so a restart does not lose today's counts."""
+    stream_analytics.snapshot()
+
+
+# Generated audio is served by the media router (ETag, Range, immutable caching);
+# it must be registered before the /static mount to take precedence.
+app.include_router(media.router, tags=["Media"])
+
+# Fail at startup, not on the first request, if the configured storage backend is unusable
+storage.get_storage()
+
+# Mount Static Files for other local assets (only for local storage with an existing root)
+if storage.STORAGE_BACKEND == "local" and storage.STORAGE_ROOT.is_dir():
+    app.mount("/static", StaticFiles(directory=storage.STORAGE_ROOT), name="static")
 
 # CORS Configuration
 cors_origins = [
@@ -65,6 +87,7 @@ app.include_router(eligibility.router,  prefix="/api/eligibility",  tags=["Eligi
 app.include_router(document.router,     prefix="/api/document",     tags=["Document"])
 app.include_router(skills.router,       prefix="/api/skills",       tags=["Skills & Jobs"])
 app.include_router(analytics.router,    prefix="/api/analytics",    tags=["Analytics"])
+app.include_router(schemes.router,      prefix="/api/schemes",      tags=["Schemes"])
 
 
 @app.get("/", tags=["Health"])
@@ -77,12 +100,20 @@ def read_root():
     }
 
 
-@app.get("/seed-database", tags=["Admin"])
+@app.post("/seed-database", tags=["Admin"])
 def seed_database():
-    """Seed the database with sample government schemes."""
+    """
+    Seed the database with sample government schemes (idempotent upsert; IDs are kept).
+    POST only, so crawlers and link prefetches cannot trigger it; schemes loaded from
+    other catalog files are never removed by the seed.
+    """
     try:
-        from seed import seed_data
-        seed_data()
-        return {"status": "success", "message": "Database seeded with 36 government schemes!"}
+        from seed import seed_data, SCHEMES
+        result = seed_data()
+        return {
+            "status": "success",
+            "message": f"Database seeded with {len(SCHEMES)} government schemes!",
+            **result,
+        }
     except Exception as e:
         return {"status": "error", "message": f"Failed to seed database: {str(e)}"}
@@ -1,7 +1,7 @@
 """
 SQLAlchemy ORM models for JanAccess AI.
 """
-from sqlalchemy import Column, Integer, String, Text, Float, TIMESTAMP
+from sqlalchemy import Column, Integer, String, Text, Float, TIMESTAMP, Date, LargeBinary, ForeignKey, Index
 from datetime import datetime
 from database import Base
 
@@ -9,6 +9,8 @@ from database import Base
 class Scheme(Base):
     """Government scheme information."""
     __tablename__ = "schemes"
+    # Never reuse the id of a deleted scheme: tombstones and client caches refer to it
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, nullable=False)
@@ -24,6 +26,8 @@ class Scheme(Base):
     max_income = Column(Float, default=0)           # 0 = no limit
     target_categories = Column(String, default="All")  # Comma-separated: "SC,ST,OBC,General"
     website = Column(String, nullable=True)         # Official portal URL
+    slug = Column(String, unique=True, index=True, nullable=True)   # Stable natural key for catalog loads
+    catalog_version = Column(Integer, nullable=True, index=True)    # Version that last added/changed the row
 
 
 class Interaction(Base):
@@ -35,8 +39,10 @@ class Interaction(Base):
     query = Column(Text, nullable=False)
     response = Column(Text)
     persona = Column(String, nullable=True, index=True)
-    timestamp = Column(TIMESTAMP, default=datetime.utcnow)
+    timestamp = Column(TIMESTAMP, default=datetime.utcnow, index=True)
     voice_file_path = Column(String, nullable=True)
+    response_compressed = Column(LargeBinary, nullable=True)   # zlib; set (and response cleared) by retention
+    speech_token = Column(String(32), nullable=True, unique=True, index=True)  # Unguessable /speech/{token} id
 
 
 class DocumentAnalysis(Base):
@@ -47,6 +53,10 @@ class DocumentAnalysis(Base):
     filename = Column(String)
     content_summary = Column(Text)
     simplification = Column(Text)
+    next_steps = Column(Text, nullable=True)
+    content_sha256 = Column(String(64), nullable=True, index=True)   # Hash of the uploaded bytes
+    text_sha256 = Column(String(64), nullable=True, index=True)      # Hash of the normalized text
+    analysis_version = Column(String(16), nullable=True)             # Prompt/model fingerprint; NULL = not reusable
     uploaded_at = Column(TIMESTAMP, default=datetime.utcnow)
 
 
@@ -60,3 +70,131 @@ class SearchHistory(Base):
     persona = Column(String, nullable=True, index=True)
     matched_schemes = Column(Text, nullable=True)   # Comma-separated scheme names
     timestamp = Column(TIMESTAMP, default=datetime.utcnow)
+
+    # Keyset pagination and time-window scans order by (timestamp, id)
+    __table_args__ = (Index("ix_search_history_timestamp_id", "timestamp", "id"),)
+
+
+class SearchHistoryMatch(Base):
+    """One row per scheme matched by a search (normalized form of matched_schemes)."""
+    __tablename__ = "search_history_matches"
+
+    search_id = Column(Integer, ForeignKey("search_history.id", ondelete="CASCADE"), primary_key=True)
+    scheme_id = Column(Integer, primary_key=True, index=True)
+
+
+class DocumentJob(Base):
+    """Background document analysis job (see services/document_jobs.py)."""
+    __tablename__ = "document_jobs"
+
+    id = Column(String(36), primary_key=True)       # UUID
+    filename = Column(String)
+    status = Column(String, default="queued", index=True)   # queued / running / done / failed
+    pages_done = Column(Integer, default=0)
+    pages_total = Column(Integer, default=0)
+    chunks_done = Column(Integer, default=0)
+    chunks_total = Column(Integer, default=0)
+    result = Column(Text, nullable=True)            # AnalysisResponse JSON
+    error = Column(Text, nullable=True)
+    created_at = Column(TIMESTAMP, default=datetime.utcnow)
+    updated_at = Column(TIMESTAMP, default=datetime.utcnow)
+
+
+class AnalyticsTotal(Base):
+    """Running analytics totals ("queries", "documents"), kept by services/analytics_service.py."""
+    __tablename__ = "analytics_totals"
+
+    name = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class CategoryRollup(Base):
+    """Search-history entries per matched category."""
+    __tablename__ = "analytics_category_rollups"
+
+    category = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class PersonaRollup(Base):
+    """Interactions per persona."""
+    __tablename__ = "analytics_persona_rollups"
+
+    persona = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class PersonaCategoryRollup(Base):
+    """Search-history entries per (persona, category)."""
+    __tablename__ = "analytics_persona_category_rollups"
+
+    persona = Column(String, primary_key=True)
+    category = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class AnalyticsSnapshot(Base):
+    """Daily snapshot of the live sketches (see services/stream_analytics.py)."""
+    __tablename__ = "analytics_snapshots"
+
+    day = Column(Date, primary_key=True)
+    hll = Column(LargeBinary)                       # HyperLogLog registers of user_ids
+    cms = Column(LargeBinary)                       # Count-Min sketch of normalized queries
+    top_queries = Column(Text)                      # JSON {query: estimated count}
+    persona_counts = Column(Text)                   # JSON {persona: count}
+    interactions = Column(Integer, default=0)
+    updated_at = Column(TIMESTAMP, default=datetime.utcnow)
+
+
+class InteractionArchive(Base):
+    """Interactions older than the retention window, moved out of the live table."""
+    __tablename__ = "interactions_archive"
+
+    id = Column(Integer, primary_key=True)          # Same id as the original row
+    user_id = Column(String)
+    query = Column(Text)
+    response_compressed = Column(LargeBinary)       # zlib
+    persona = Column(String, nullable=True)
+    timestamp = Column(TIMESTAMP, index=True)
+
+
+class SearchHistoryArchive(Base):
+    """Search-history entries older than the retention window."""
+    __tablename__ = "search_history_archive"
+
+    id = Column(Integer, primary_key=True)          # Same id as the original row
+    query_text = Column(Text)
+    category = Column(String, nullable=True)
+    persona = Column(String, nullable=True)
+    matched_schemes = Column(Text, nullable=True)
+    timestamp = Column(TIMESTAMP, index=True)
+
+
+class ArchivedSchemeMatchCount(Base):
+    """Scheme-match counts folded in from archived search history (keeps /top-schemes intact)."""
+    __tablename__ = "archived_scheme_match_counts"
+
+    scheme_id = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class CatalogVersion(Base):
+    """One row per catalog load that changed something (see services/catalog_service.py)."""
+    __tablename__ = "catalog_versions"
+
+    id = Column(Integer, primary_key=True)          # The version number
+    source = Column(String)
+    added = Column(Integer, default=0)
+    updated = Column(Integer, default=0)
+    removed = Column(Integer, default=0)
+    created_at = Column(TIMESTAMP, default=datetime.utcnow)
+
+
+class SchemeTombstone(Base):
+    """A scheme removed by a catalog load, for clients syncing deltas since a version."""
+    __tablename__ = "scheme_tombstones"
+
+    id = Column(Integer, primary_key=True)
+    scheme_id = Column(Integer, index=True)
+    slug = Column(String)
+    catalog_version = Column(Integer, index=True)
@@ -84,3 +84,34 @@ PERSONA_QUICK_ACTIONS: dict[str, list[dict[str, str]]] = {
         {"label": "💼 Job Reservation",   "query": "What job reservations exist for differently abled persons?"},
     ],
 }
+
+
+# ─── Persona → Scheme Categories (catalog browsing / search filters) ──
+PERSONA_CATEGORIES: dict[str, list[str]] = {
+    "Farmer": ["Agriculture", "Employment", "Welfare", "Health"],
+    "Student": ["Education", "Skill Development"],
+    "Job Seeker": ["Employment", "Skill Development", "Business"],
+    "Small Business Owner": ["Business", "Women & Child"],
+    "Senior Citizen": ["Senior Citizens", "Health", "Welfare"],
+    "Differently Abled": ["Welfare", "Health", "Employment", "Education"],
+}
+
+
+# ─── Everyday Words → Catalog Keywords (keyword matching, suggestions) ──
+# A user might say "farmer" where the catalog says "rural", "employment"
+KEYWORD_SYNONYMS: dict[str, list[str]] = {
+    "farmer": ["rural", "employment", "mgnrega", "agriculture", "kisan"],
+    "farm": ["rural", "agriculture", "mgnrega", "kisan"],
+    "house": ["housing", "awas", "pmay"],
+    "home": ["housing", "awas", "pmay"],
+    "doctor": ["health", "hospital", "ayushman"],
+    "medicine": ["health", "hospital", "ayushman"],
+    "school": ["education", "scholarship", "study"],
+    "college": ["education", "scholarship", "study"],
+    "work": ["employment", "job", "skill", "mgnrega"],
+    "money": ["income", "welfare", "benefit"],
+    "gas": ["ujjwala", "lpg", "cooking"],
+    "cooking": ["ujjwala", "lpg", "gas"],
+    "poor": ["bpl", "welfare", "income"],
+    "learn": ["skill", "training", "kaushal", "education"],
+}
@@ -1,71 +1,44 @@
 """
 Analytics Router — Dashboard statistics, admin endpoints, and persona usage.
 """
+import os
+import asyncio
 import logging
-from fastapi import APIRouter, Depends, Query
+from datetime import date, datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 
 from database import get_db
-from models import Interaction, SearchHistory, DocumentAnalysis, Scheme
+from schemas import VolumeResponse
+from services import tts_backends, analytics_service, stream_analytics, retention_service
+from services.snapshot_cache import SnapshotCache
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Dashboard snapshots: fresh for ANALYTICS_CACHE_TTL, served stale (while refreshing)
+# up to ANALYTICS_CACHE_MAX_STALE
+CACHE_TTL = float(os.getenv("ANALYTICS_CACHE_TTL", "15"))
+CACHE_MAX_STALE = float(os.getenv("ANALYTICS_CACHE_MAX_STALE", "300"))
+
+_summary_cache = SnapshotCache("summary", analytics_service.summary_snapshot, CACHE_TTL, CACHE_MAX_STALE)
+_persona_usage_cache = SnapshotCache(
+    "persona-usage", analytics_service.persona_usage_snapshot, CACHE_TTL, CACHE_MAX_STALE
+)
+
 
 @router.get("/summary")
-async def get_analytics_summary(db: Session = Depends(get_db)):
+async def get_analytics_summary(response: Response):
     """
     Returns summary statistics for the analytics dashboard.
     Now includes persona_breakdown.
+    Served from a snapshot refreshed in the background (the Age header gives its age in seconds).
     """
-    total_queries = db.query(Interaction).count()
-    total_documents = db.query(DocumentAnalysis).count()
-    total_schemes = db.query(Scheme).count()
-
-    # Category breakdown from search history
-    category_rows = (
-        db.query(SearchHistory.category, func.count(SearchHistory.id))
-        .filter(SearchHistory.category.isnot(None))
-        .group_by(SearchHistory.category)
-        .all()
-    )
-    category_breakdown = {cat: count for cat, count in category_rows}
-
-    # Persona breakdown from interactions
-    persona_rows = (
-        db.query(Interaction.persona, func.count(Interaction.id))
-        .filter(Interaction.persona.isnot(None))
-        .group_by(Interaction.persona)
-        .all()
-    )
-    persona_breakdown = {persona: count for persona, count in persona_rows}
-
-    # Recent queries
-    recent = (
-        db.query(Interaction)
-        .order_by(Interaction.timestamp.desc())
-        .limit(10)
-        .all()
-    )
-    recent_queries = [
-        {
-            "query": i.query,
-            "response": (i.response or "")[:100] + "..." if i.response and len(i.response) > 100 else i.response,
-            "persona": i.persona,
-            "timestamp": str(i.timestamp)
-        }
-        for i in recent
-    ]
-
-    return {
-        "total_queries": total_queries,
-        "total_documents": total_documents,
-        "total_schemes": total_schemes,
-        "category_breakdown": category_breakdown,
-        "persona_breakdown": persona_breakdown,
-        "recent_queries": recent_queries
-    }
+    summary, age = await _summary_cache.get()
+    response.headers["Age"] = str(int(age))
+    return summary
 
 
 @router.get("/top-schemes")
@@ -76,97 +49,175 @@ async def get_top_schemes(
     """
     Admin endpoint: returns the most searched/matched schemes.
     """
-    # Parse matched_schemes from SearchHistory and count occurrences
-    history = db.query(SearchHistory.matched_schemes).filter(
-        SearchHistory.matched_schemes.isnot(None)
-    ).all()
-
-    scheme_counts = {}
-    for (matched,) in history:
-        if matched:
-            for name in matched.split(","):
-                name = name.strip()
-                if name:
-                    scheme_counts[name] = scheme_counts.get(name, 0) + 1
-
-    # Sort by count descending
-    sorted_schemes = sorted(scheme_counts.items(), key=lambda x: x[1], reverse=True)[:limit]
+    rows = analytics_service.top_schemes(db, limit)
 
     return {
         "top_schemes": [
             {"name": name, "search_count": count}
-            for name, count in sorted_schemes
+            for name, count in rows
         ]
     }
 
 
 @router.get("/history")
 async def get_search_history(
+    response: Response,
     limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None, description="X-Next-Cursor from the previous page"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    persona: Optional[str] = None,
+    category: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """
-    Returns paginated search history.
+    Returns search history newest first, one page at a time, including entries
+    retention has moved to the archive.
+    Pass the X-Next-Cursor response header back as `cursor` for the next page
+    (absent on the last page). Filters: [since, until) window, persona, category.
     """
-    history = (
-        db.query(SearchHistory)
-        .order_by(SearchHistory.timestamp.desc())
-        .limit(limit)
-        .all()
+    try:
+        history, next_cursor = analytics_service.history_page(
+            db, limit, cursor, since=since, until=until, persona=persona, category=category
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [analytics_service.history_row(h) for h in history]
+
+
+@router.get("/history/export")
+async def export_search_history(
+    format: str = Query(default="ndjson", pattern="^(csv|ndjson)$"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    persona: Optional[str] = None,
+    category: Optional[str] = None,
+):
+    """
+    Streams the whole (filtered) search history, archived entries included, oldest
+    first as CSV or NDJSON, without loading it into memory.
+    """
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    stamp = datetime.utcnow().strftime("%Y%m%d")
+    return StreamingResponse(
+        analytics_service.iter_history_export(
+            format, since=since, until=until, persona=persona, category=category
+        ),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="search_history_{stamp}.{format}"'},
     )
 
-    return [
-        {
-            "id": h.id,
-            "query": h.query_text,
-            "category": h.category,
-            "persona": h.persona,
-            "matched_schemes": h.matched_schemes,
-            "timestamp": str(h.timestamp)
-        }
-        for h in history
-    ]
+
+@router.get("/volume", response_model=VolumeResponse)
+async def get_query_volume(
+    interval: str = Query(default="day", pattern="^(hour|day|week)$"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Query counts per hour/day/week over [since, until), broken down by persona and category.
+    Defaults to the last 2 days (hour), 30 days (day) or 26 weeks (week).
+    Times are UTC; weeks start on Monday.
+    """
+    try:
+        return analytics_service.query_volume(db, interval, since, until)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/live")
+async def get_live_stats(
+    day: Optional[date] = Query(default=None, description="UTC day (default today)"),
+    limit: int = Query(default=10, ge=1, le=50),
+):
+    """
+    Approximate unique users (HyperLogLog), interaction and persona counts, and trending
+    questions (Count-Min + top-K) for a day, from in-memory sketches — no table scans.
+    Past days are read from their stored snapshot.
+    """
+    return await asyncio.to_thread(stream_analytics.live_stats, limit, day)
+
+
+@router.get("/trending")
+async def get_trending_queries(limit: int = Query(default=10, ge=1, le=50)):
+    """Today's most frequent (normalized) questions."""
+    stats = await asyncio.to_thread(stream_analytics.live_stats, limit)
+    return {"day": stats["day"], "trending_queries": stats["trending_queries"]}
+
+
+@router.post("/live/snapshot")
+async def snapshot_live_stats():
+    """Admin endpoint: persist the live sketches now instead of waiting for the next periodic snapshot."""
+    await asyncio.to_thread(stream_analytics.snapshot)
+    return {"status": "success"}
 
 
 @router.get("/persona-usage")
-async def get_persona_usage(db: Session = Depends(get_db)):
+async def get_persona_usage(response: Response):
     """
     GET /analytics/persona-usage
     Returns:
       - most_selected_persona
       - persona_counts — {persona: count}
       - top_topics_per_persona — {persona: [top-3 categories]}
+    Served from a snapshot refreshed in the background, like /summary.
     """
-    # Count interactions per persona
-    persona_rows = (
-        db.query(Interaction.persona, func.count(Interaction.id))
-        .filter(Interaction.persona.isnot(None))
-        .group_by(Interaction.persona)
-        .order_by(func.count(Interaction.id).desc())
-        .all()
-    )
+    usage, age = await _persona_usage_cache.get()
+    response.headers["Age"] = str(int(age))
+    return usage
 
-    persona_counts = {persona: count for persona, count in persona_rows}
-    most_selected = persona_rows[0][0] if persona_rows else None
 
-    # Top categories per persona from search_history
-    all_persona_categories = (
-        db.query(SearchHistory.persona, SearchHistory.category, func.count(SearchHistory.id))
-        .filter(SearchHistory.persona.isnot(None), SearchHistory.category.isnot(None))
-        .group_by(SearchHistory.persona, SearchHistory.category)
-        .order_by(SearchHistory.persona, func.count(SearchHistory.id).desc())
-        .all()
-    )
+@router.post("/cache/invalidate")
+async def invalidate_snapshots():
+    """Admin endpoint: drop the cached /summary and /persona-usage snapshots."""
+    invalidate_snapshot_caches()
+    return {"status": "success"}
+
+
+def invalidate_snapshot_caches():
+    """Hook for code that changes analytics data in bulk (rebuilds, retention)."""
+    _summary_cache.invalidate()
+    _persona_usage_cache.invalidate()
+
+
+@router.post("/rollups/rebuild")
+async def rebuild_rollups(db: Session = Depends(get_db)):
+    """
+    Admin endpoint: recompute the analytics rollup tables from the full history.
+    Only needed after editing history rows directly.
+    """
+    analytics_service.rebuild_rollups(db)
+    invalidate_snapshot_caches()
+    return {"status": "success"}
 
-    top_topics: dict[str, list[str]] = {}
-    for persona, category, _count in all_persona_categories:
-        if persona not in top_topics:
-            top_topics[persona] = []
-        if len(top_topics[persona]) < 3:
-            top_topics[persona].append(category)
 
+@router.post("/retention/run")
+async def run_retention():
+    """
+    Admin endpoint: compress and archive old interaction logs now, instead of waiting
+    for the background job. Returns how many rows each step handled.
+    """
+    totals = await asyncio.to_thread(retention_service.run_until_done)
+    invalidate_snapshot_caches()
+    return {
+        "status": "success",
+        "compress_after_days": retention_service.RETENTION_COMPRESS_DAYS,
+        "archive_after_days": retention_service.RETENTION_ARCHIVE_DAYS,
+        **totals,
+    }
+
+
+@router.get("/tts-metrics")
+async def get_tts_metrics():
+    """
+    Admin endpoint: per-backend text-to-speech latency and error counts since startup,
+    plus the backend selected for each language.
+    """
     return {
-        "most_selected_persona": most_selected,
-        "persona_counts": persona_counts,
-        "top_topics_per_persona": top_topics,
+        "backends": tts_backends.get_metrics(),
+        "language_backends": tts_backends.LANGUAGE_BACKENDS,
     }
@@ -1,40 +1,24 @@
 """
 Assistant Router — Chat and Voice endpoints (persona-aware).
 """
-import os
-import uuid
-import shutil
+import re
+import json
+import asyncio
 import logging
+import secrets
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Query
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from database import get_db
+from database import get_db, SessionLocal
 from models import Interaction, Scheme, SearchHistory
-from services import ai_service, speech_service
-from persona_config import PERSONA_OPTIONS
+from services import ai_service, speech_service, analytics_service, stream_analytics, retention_service
+from persona_config import PERSONA_OPTIONS, KEYWORD_SYNONYMS
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Synonym map: user might say "farmer" but DB has "rural", "employment"
-_SYNONYMS = {
-    "farmer": ["rural", "employment", "mgnrega", "agriculture", "kisan"],
-    "farm": ["rural", "agriculture", "mgnrega", "kisan"],
-    "house": ["housing", "awas", "pmay"],
-    "home": ["housing", "awas", "pmay"],
-    "doctor": ["health", "hospital", "ayushman"],
-    "medicine": ["health", "hospital", "ayushman"],
-    "school": ["education", "scholarship", "study"],
-    "college": ["education", "scholarship", "study"],
-    "work": ["employment", "job", "skill", "mgnrega"],
-    "money": ["income", "welfare", "benefit"],
-    "gas": ["ujjwala", "lpg", "cooking"],
-    "cooking": ["ujjwala", "lpg", "gas"],
-    "poor": ["bpl", "welfare", "income"],
-    "learn": ["skill", "training", "kaushal", "education"],
-}
-
 
 def _keyword_match_schemes(query: str, schemes: list) -> list:
     """Smart keyword search with synonym expansion and scoring."""
@@ -49,8 +33,8 @@ def _keyword_match_schemes(query: str, schemes: list) -> list:
     # Expand synonyms
     expanded_words = set(words)
     for word in words:
-        if word in _SYNONYMS:
-            expanded_words.update(_SYNONYMS[word])
+        if word in KEYWORD_SYNONYMS:
+            expanded_words.update(KEYWORD_SYNONYMS[word])
 
     # Score each scheme
     scored = []
@@ -79,6 +63,57 @@ def _validate_persona(persona: str | None) -> str | None:
     return None
 
 
+async def _find_relevant_schemes(query: str, db: Session) -> list:
+    """Try AI-based scheme matching first, fall back to keyword search."""
+    schemes = db.query(Scheme).all()
+    logger.debug(f"Found {len(schemes)} schemes")
+
+    relevant_schemes = []
+    matched_ids = await ai_service.match_schemes(query, schemes)
+    if matched_ids:
+        relevant_schemes = [s for s in schemes if s.id in matched_ids]
+
+    # Fallback: smart keyword matching with scoring
+    if not relevant_schemes:
+        relevant_schemes = _keyword_match_schemes(query, schemes)
+    return relevant_schemes
+
+
+def _build_context(relevant_schemes: list) -> str:
+    return "\n".join([
+        f"• {s.name} ({s.category}): {s.description}\n  Website: {s.website}"
+        for s in relevant_schemes
+    ]) if relevant_schemes else ""
+
+
+def _log_interaction(db: Session, user_id: str | None, query: str, response_text: str,
+                     persona: str | None, relevant_schemes: list) -> Interaction:
+    """Store the interaction and its search-history entry for analytics."""
+    interaction = Interaction(
+        user_id=user_id,
+        query=query,
+        response=response_text,
+        persona=persona,
+        speech_token=secrets.token_urlsafe(16),
+    )
+    db.add(interaction)
+
+    category = relevant_schemes[0].category if relevant_schemes else None
+    search_entry = SearchHistory(
+        query_text=query,
+        category=category,
+        persona=persona,
+        matched_schemes=",".join([s.name for s in relevant_schemes]) if relevant_schemes else None
+    )
+    db.add(search_entry)
+    db.flush()  # Assigns search_entry.id for the match rows
+    analytics_service.record_scheme_matches(db, search_entry.id, [s.id for s in relevant_schemes])
+    analytics_service.record_interaction(db, persona, category)
+    db.commit()
+    stream_analytics.record_interaction(user_id, query, persona)
+    return interaction
+
+
 @router.post("/chat")
 async def chat_interaction(
     query: str = Query(..., min_length=1, max_length=2000),
@@ -97,56 +132,25 @@ async def chat_interaction(
     print(f"DEBUG: Chat request received - query: {query}, persona: {persona}")
 
     try:
-        # 1. Fetch all schemes for context
-        schemes = db.query(Scheme).all()
-        print(f"DEBUG: Found {len(schemes)} schemes")
-
-        # 2. Try AI-based scheme matching first, fall back to keyword search
-        relevant_schemes = []
-        matched_ids = await ai_service.match_schemes(query, schemes)
-        if matched_ids:
-            relevant_schemes = [s for s in schemes if s.id in matched_ids]
-
-        # Fallback: smart keyword matching with scoring
-        if not relevant_schemes:
-            relevant_schemes = _keyword_match_schemes(query, schemes)
+        # 1–2. Find relevant schemes (AI matching, keyword fallback)
+        relevant_schemes = await _find_relevant_schemes(query, db)
 
         # 3. Build context (include websites for AI to reference)
-        context = "\n".join([
-            f"• {s.name} ({s.category}): {s.description}\n  Website: {s.website}" 
-            for s in relevant_schemes
-        ]) if relevant_schemes else ""
+        context = _build_context(relevant_schemes)
 
         # 4. Generate AI response (persona-aware)
         print("DEBUG: Calling AI service...")
         response_text = await ai_service.generate_conversational_response(query, context, persona)
         print(f"DEBUG: AI response received: {response_text[:50]}...")
 
-        # 5. Log interaction
-        interaction = Interaction(
-            user_id=user_id,
-            query=query,
-            response=response_text,
-            persona=persona,
-        )
-        db.add(interaction)
-
-        # 6. Log search history for analytics
-        search_entry = SearchHistory(
-            query_text=query,
-            category=relevant_schemes[0].category if relevant_schemes else None,
-            persona=persona,
-            matched_schemes=",".join([s.name for s in relevant_schemes]) if relevant_schemes else None
-        )
-        db.add(search_entry)
-        db.commit()
+        # 5–6. Log interaction and search history for analytics
+        interaction = _log_interaction(db, user_id, query, response_text, persona, relevant_schemes)
 
-        # 7. Generate audio (skip in low bandwidth mode)
+        # 7. Audio is streamed sentence by sentence from /speech/{token} (skip in low bandwidth mode)
         audio_url = None
         if not low_bandwidth:
-            audio_path = speech_service.text_to_speech(response_text)
-            if audio_path:
-                audio_url = f"/static/audio/{os.path.basename(audio_path)}"
+            speech_service.prefetch_speech(response_text)
+            audio_url = f"/api/assistant/speech/{interaction.speech_token}"
 
         return {
             "text_response": response_text,
@@ -176,17 +180,19 @@ async def voice_interaction(
     """
     persona = _validate_persona(persona)
 
-    # Save uploaded audio
-    upload_dir = "static/uploads"
-    os.makedirs(upload_dir, exist_ok=True)
-    file_path = f"{upload_dir}/{uuid.uuid4()}.webm"
-
+    # Read the upload into memory (no temp file)
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        audio = await speech_service.read_audio_upload(file)
+    except speech_service.AudioTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
 
+    try:
         # Transcribe
-        transcribed_text = await speech_service.transcribe_audio(file_path)
+        transcribed_text = await speech_service.transcribe_audio(
+            audio,
+            filename=file.filename or "recording.webm",
+            content_type=file.content_type or "audio/webm",
+        )
 
         # Use chat logic
         result = await chat_interaction(
@@ -200,13 +206,164 @@ async def voice_interaction(
     except Exception as e:
         logger.error(f"Voice chat error: {e}")
         raise HTTPException(status_code=500, detail="Voice processing failed.")
-    finally:
-        # Cleanup uploaded file
-        if os.path.exists(file_path):
+
+
+@router.websocket("/voice-ws")
+async def voice_session(websocket: WebSocket):
+    """
+    Streaming voice session.
+    Client → server:
+      {"type": "start", "persona"?, "user_id"?, "lang"?, "content_type"?}   (optional, once or per turn)
+      <binary audio chunks while the user speaks>
+      {"type": "stop"}                                                       (user stopped speaking)
+    Server → client, per turn:
+      {"type": "transcript", "text"}
+      {"type": "answer_delta", "text"}            (as the answer streams in)
+      {"type": "audio", "index", "url"}           (one per sentence, in order)
+      {"type": "done", "interaction_id", "text", "schemes"}
+      {"type": "error", "detail"}
+    """
+    await websocket.accept()
+    settings = {"persona": None, "user_id": "demo_user", "lang": "en", "content_type": "audio/webm"}
+    buffer = bytearray()
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+
+            if message.get("bytes") is not None:
+                buffer.extend(message["bytes"])
+                if len(buffer) > speech_service.MAX_AUDIO_BYTES:
+                    buffer.clear()
+                    await websocket.send_json({"type": "error", "detail": "Audio is too long."})
+                continue
+
             try:
-                os.remove(file_path)
-            except OSError:
-                pass
+                event = json.loads(message.get("text") or "{}")
+            except ValueError:
+                await websocket.send_json({"type": "error", "detail": "Invalid message."})
+                continue
+
+            if event.get("type") == "start":
+                settings.update({k: event[k] for k in settings if event.get(k)})
+                settings["persona"] = _validate_persona(settings["persona"])
+                buffer.clear()
+            elif event.get("type") == "stop":
+                audio = bytes(buffer)
+                buffer.clear()
+                if not audio:
+                    await websocket.send_json({"type": "error", "detail": "No audio received."})
+                    continue
+                await _run_voice_turn(websocket, audio, settings)
+    except WebSocketDisconnect:
+        return
+
+
+_SENTENCE_END_RE = re.compile(r"[.!?।॥](?=\s)|\n")
+
+
+async def _run_voice_turn(websocket: WebSocket, audio: bytes, settings: dict):
+    """
+    Transcribe one utterance, then stream the answer text and per-sentence audio URLs.
+    Each turn uses its own database session, so an idle socket holds no connection.
+    """
+    with SessionLocal() as db:
+        await _answer_voice_turn(websocket, db, audio, settings)
+
+
+async def _answer_voice_turn(websocket: WebSocket, db: Session, audio: bytes, settings: dict):
+    try:
+        transcript = await speech_service.transcribe_audio(
+            audio, filename="recording.webm", content_type=settings["content_type"]
+        )
+        await websocket.send_json({"type": "transcript", "text": transcript})
+
+        relevant_schemes = await _find_relevant_schemes(transcript, db)
+        context = _build_context(relevant_schemes)
+
+        # Sentences are sent to TTS as soon as they are complete; URLs go out in order
+        audio_queue: asyncio.Queue = asyncio.Queue()
+        sender = asyncio.create_task(_send_audio_urls(websocket, audio_queue))
+
+        def speak(text: str):
+            for sentence in speech_service.split_sentences(text):
+                audio_queue.put_nowait(asyncio.ensure_future(
+                    speech_service.synthesize_sentence_url(sentence, settings["lang"])
+                ))
+
+        answer, pending = "", ""
+        try:
+            async for delta in ai_service.stream_conversational_response(
+                transcript, context, settings["persona"], settings["lang"]
+            ):
+                answer += delta
+                pending += delta
+                await websocket.send_json({"type": "answer_delta", "text": delta})
+                boundary = None
+                for boundary in _SENTENCE_END_RE.finditer(pending):
+                    pass
+                if boundary:
+                    speak(pending[:boundary.end()])
+                    pending = pending[boundary.end():]
+            speak(pending)
+        finally:
+            audio_queue.put_nowait(None)
+            await sender
+
+        interaction = _log_interaction(
+            db, settings["user_id"], transcript, answer, settings["persona"], relevant_schemes
+        )
+        await websocket.send_json({
+            "type": "done",
+            "interaction_id": interaction.id,
+            "text": answer,
+            "schemes": [{"name": s.name, "website": s.website} for s in relevant_schemes],
+        })
+    except WebSocketDisconnect:
+        raise
+    except Exception as e:
+        logger.error(f"Voice session error: {e}")
+        db.rollback()
+        await websocket.send_json({"type": "error", "detail": "Voice processing failed."})
+
+
+async def _send_audio_urls(websocket: WebSocket, audio_queue: asyncio.Queue):
+    index = 0
+    while (future := await audio_queue.get()) is not None:
+        try:
+            url = await future
+        except Exception as e:
+            logger.error(f"TTS error: {e}")
+            continue
+        await websocket.send_json({"type": "audio", "index": index, "url": url})
+        index += 1
+
+
+@router.get("/speech/{speech_token}")
+async def stream_speech(
+    speech_token: str,
+    lang: str = Query(default="en", max_length=5),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream the spoken answer for an interaction as chunked audio, addressed by the
+    interaction's unguessable speech token (the `audio_url` returned by /chat).
+    Sentences are synthesized in parallel and sent in order, so playback starts
+    after the first sentence and the whole answer is spoken.
+    """
+    interaction = db.query(Interaction).filter(Interaction.speech_token == speech_token).first()
+    text = retention_service.response_text(interaction) if interaction else None
+    if not text:
+        raise HTTPException(status_code=404, detail="Interaction not found.")
+
+    # Not cacheable: the response is private, and a sentence whose synthesis fails is skipped
+    return StreamingResponse(
+        speech_service.iter_speech(text, lang),
+        media_type=speech_service.speech_media_type(lang),
+        headers={"Cache-Control": "private, no-store"},
+    )
 
 
 @router.get("/persona-options")
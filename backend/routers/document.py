@@ -2,110 +2,215 @@
 Document Router — Upload, extract, and simplify government documents.
 """
 import os
-import uuid
-import shutil
+import json
+import zipfile
+import asyncio
 import logging
-from fastapi import APIRouter, File, UploadFile, Depends, HTTPException
+from fastapi import APIRouter, File, UploadFile, Depends, HTTPException, Request, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
-from database import get_db
-from models import DocumentAnalysis
-from services import ai_service
-from schemas import AnalysisResponse
+from database import get_db, SessionLocal
+from models import DocumentAnalysis, DocumentJob
+from services import ai_service, document_service, document_jobs
+from schemas import AnalysisResponse, DocumentJobStatus
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-UPLOAD_DIR = "backend/static/documents"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+ALLOWED_EXTENSIONS = document_service.SUPPORTED_EXTENSIONS
 
 
 @router.post("/analyze", response_model=AnalysisResponse)
 async def analyze_document(
+    request: Request,
     file: UploadFile = File(...),
+    async_job: bool = Query(default=False, description="Return 202 with a job ID instead of waiting"),
     db: Session = Depends(get_db)
 ):
     """
     Upload a document (TXT or PDF) and get a simplified explanation.
+    With `async_job=true` the analysis runs in the background: poll
+    /jobs/{job_id}, fetch /jobs/{job_id}/result, or follow /jobs/{job_id}/events.
     """
     # Validate file type
-    allowed_extensions = [".txt", ".pdf"]
     file_ext = os.path.splitext(file.filename or "")[1].lower()
-    if file_ext not in allowed_extensions:
+    if file_ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=400,
-            detail=f"Unsupported file type '{file_ext}'. Allowed: {', '.join(allowed_extensions)}"
+            detail=f"Unsupported file type '{file_ext}'. Allowed: {', '.join(ALLOWED_EXTENSIONS)}"
         )
 
-    # Save file
-    safe_filename = f"{uuid.uuid4()}{file_ext}"
-    file_path = os.path.join(UPLOAD_DIR, safe_filename)
+    # Reject oversized uploads early when the client declares a length
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > document_service.MAX_UPLOAD_BYTES + 64 * 1024:
+        raise HTTPException(status_code=413, detail="File is too large.")
 
+    # Buffer upload in memory (spills to disk only for large files), hashing as it streams
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        # Extract text
-        content = ""
-        if file_ext == ".txt":
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read()
-        elif file_ext == ".pdf":
-            content = _extract_pdf_text(file_path)
-
-        if not content.strip():
-            content = "The document appears to be empty or could not be read."
-
-        # Simplify using AI
-        simplification = await ai_service.simplify_text(content)
-        next_steps = await ai_service.generate_next_steps(content)
-
-        # Store in database
-        summary = content[:300] + "..." if len(content) > 300 else content
-        analysis = DocumentAnalysis(
-            filename=file.filename,
-            content_summary=summary,
-            simplification=simplification
-        )
-        db.add(analysis)
-        db.commit()
-        db.refresh(analysis)
-
-        return AnalysisResponse(
-            filename=file.filename or "unknown",
-            summary=summary,
-            simplification=simplification,
-            next_steps=next_steps
-        )
+        upload, content_hash = await document_service.spool_upload(file)
+    except document_service.UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    if async_job:
+        try:
+            job = document_jobs.submit(db, upload, content_hash, file.filename, file_ext)
+        except document_jobs.JobQueueFullError as e:
+            upload.close()
+            raise HTTPException(status_code=503, detail=str(e))
+        base = f"/api/document/jobs/{job.id}"
+        return JSONResponse(status_code=202, content={
+            "job_id": job.id,
+            "status": job.status,
+            "status_url": base,
+            "result_url": f"{base}/result",
+            "events_url": f"{base}/events",
+        })
 
+    try:
+        return await document_service.analyze_upload(db, upload, content_hash, file.filename, file_ext)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Document analysis error: {e}")
         raise HTTPException(status_code=500, detail="Document analysis failed.")
     finally:
-        # Cleanup uploaded file
-        if os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-            except OSError:
-                pass
+        upload.close()
 
 
-def _extract_pdf_text(file_path: str) -> str:
-    """Extract text from a PDF file using PyPDF2."""
+@router.post("/batch")
+async def analyze_batch(
+    request: Request,
+    file: UploadFile = File(...),
+):
+    """
+    Upload a zip of TXT/PDF documents and receive one NDJSON line per file as each
+    analysis finishes: {"index", "filename", "result": AnalysisResponse} or {"index", "filename", "error"}.
+    """
+    if os.path.splitext(file.filename or "")[1].lower() != ".zip":
+        raise HTTPException(status_code=400, detail="Please upload a .zip archive.")
+
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > document_service.BATCH_MAX_UPLOAD_BYTES + 64 * 1024:
+        raise HTTPException(status_code=413, detail="Archive is too large.")
+
     try:
-        from PyPDF2 import PdfReader
-        reader = PdfReader(file_path)
-        text = ""
-        for page in reader.pages[:20]:  # Limit to 20 pages
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-        return text.strip()
-    except ImportError:
-        logger.warning("PyPDF2 not installed — returning placeholder for PDF.")
-        return "PDF text extraction requires PyPDF2. Install it with: pip install PyPDF2"
-    except Exception as e:
-        logger.error(f"PDF extraction error: {e}")
-        return "Could not extract text from this PDF. The file may be scanned or encrypted."
+        upload, _ = await document_service.spool_upload(file, max_bytes=document_service.BATCH_MAX_UPLOAD_BYTES)
+    except document_service.UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    try:
+        archive = zipfile.ZipFile(upload)
+        members = document_service.archive_members(archive)
+    except zipfile.BadZipFile:
+        upload.close()
+        raise HTTPException(status_code=400, detail="The file is not a valid zip archive.")
+
+    if not members or len(members) > document_service.BATCH_MAX_FILES:
+        archive.close()
+        upload.close()
+        raise HTTPException(
+            status_code=400,
+            detail=f"The archive must contain between 1 and {document_service.BATCH_MAX_FILES} TXT or PDF files."
+        )
+
+    async def lines():
+        try:
+            async for item in document_service.iter_archive_analyses(archive, members):
+                yield item.model_dump_json() + "\n"
+        finally:
+            archive.close()
+            upload.close()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.get("/jobs/{job_id}", response_model=DocumentJobStatus)
+async def get_job_status(job_id: str, db: Session = Depends(get_db)):
+    """Current status and progress of a background analysis job."""
+    return document_jobs.to_status(_get_job(db, job_id))
+
+
+@router.get("/jobs/{job_id}/result", response_model=AnalysisResponse)
+async def get_job_result(job_id: str, db: Session = Depends(get_db)):
+    """Result of a finished job; 202 with the status while it is still running."""
+    job = _get_job(db, job_id)
+    if job.status == "failed":
+        raise HTTPException(status_code=409, detail=job.error or "Document analysis failed.")
+    if job.status != "done":
+        return JSONResponse(status_code=202, content=document_jobs.to_status(job).model_dump(mode="json"))
+    return AnalysisResponse.model_validate_json(job.result)
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, db: Session = Depends(get_db)):
+    """
+    Server-Sent Events stream of job progress (pages extracted, chunks simplified).
+    Ends with a `done` or `failed` event, or an `error` event if the job disappears or
+    the stream outlives DOCUMENT_JOB_EVENTS_MAX_SECONDS (poll the status URL instead).
+    """
+    _get_job(db, job_id)
+
+    async def events():
+        last = None
+        deadline = asyncio.get_running_loop().time() + document_jobs.JOB_EVENTS_MAX_SECONDS
+        while True:
+            status = await asyncio.to_thread(_read_status, job_id)
+            if status is None:
+                yield f"event: error\ndata: {json.dumps({'detail': 'Job not found.'})}\n\n"
+                return
+
+            if status != last:
+                event = status["status"] if status["status"] in document_jobs.FINISHED_STATUSES else "progress"
+                yield f"event: {event}\ndata: {json.dumps(status)}\n\n"
+                last = status
+            if status["status"] in document_jobs.FINISHED_STATUSES:
+                return
+            if asyncio.get_running_loop().time() >= deadline:
+                yield f"event: error\ndata: {json.dumps({'detail': 'Event stream timed out.'})}\n\n"
+                return
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.delete("/cache")
+async def invalidate_analysis_cache(
+    all_versions: bool = Query(default=False, description="Also invalidate analyses made with the current prompts/model"),
+    db: Session = Depends(get_db)
+):
+    """
+    Admin endpoint: stop reusing stored analyses.
+    By default only analyses from older prompts/models are invalidated (they are already
+    skipped on lookup); `all_versions=true` forces every document to be re-analyzed.
+    """
+    query = db.query(DocumentAnalysis).filter(DocumentAnalysis.analysis_version.isnot(None))
+    if not all_versions:
+        current = ai_service.analysis_version()
+        if current:
+            query = query.filter(DocumentAnalysis.analysis_version != current)
+    invalidated = query.update({DocumentAnalysis.analysis_version: None}, synchronize_session=False)
+    db.commit()
+
+    if all_versions:
+        ai_service.clear_chunk_cache()
+
+    return {"status": "success", "invalidated": invalidated}
+
+
+def _read_status(job_id: str):
+    """Current job status as JSON-ready data, or None if the job no longer exists."""
+    with SessionLocal() as session:
+        job = session.get(DocumentJob, job_id)
+        return document_jobs.to_status(job).model_dump(mode="json") if job else None
+
+
+def _get_job(db: Session, job_id: str) -> DocumentJob:
+    job = db.get(DocumentJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
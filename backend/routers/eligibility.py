@@ -7,8 +7,8 @@ from sqlalchemy.orm import Session
 
 from database import get_db
 from models import Scheme
-from schemas import EligibilityCriteria, EligibilityResponse
-from services import eligibility_engine, ai_service
+from schemas import EligibilityCriteria, EligibilityResponse, WhatIfRequest, WhatIfResponse, WhatIfVariant
+from services import eligibility_engine, ai_service, catalog_service
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -67,3 +67,68 @@ async def check_eligibility(
     except Exception as e:
         logger.error(f"Eligibility check error: {e}")
         raise HTTPException(status_code=500, detail="Eligibility check failed.")
+
+
+@router.post("/what-if", response_model=WhatIfResponse)
+async def what_if_eligibility(
+    request: WhatIfRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Explore profile variations (income +₹50k, age +1, different category).
+    Returns schemes gained/lost per variant and near-miss schemes that fail by a
+    single criterion. Rule-based only — no AI call — so caseworkers can iterate quickly.
+    """
+    try:
+        catalog_version = catalog_service.current_version(db)
+        all_schemes = db.query(Scheme).all()
+        names = {s.id: s.name for s in all_schemes}
+        by_id = {s.id: s for s in all_schemes}
+
+        base = request.base
+        base_eval = eligibility_engine.evaluate_profile(base, all_schemes, catalog_version)
+        base_ids = {sid for sid, failed in base_eval.items() if not failed}
+
+        variants = []
+        for i, delta in enumerate(request.deltas, start=1):
+            profile = eligibility_engine.apply_delta(
+                base,
+                income_change=delta.income_change,
+                age_change=delta.age_change,
+                category=delta.category,
+            )
+            evaluation = eligibility_engine.evaluate_variant(base, base_eval, profile, all_schemes)
+            eligible_ids = {sid for sid, failed in evaluation.items() if not failed}
+
+            variants.append(WhatIfVariant(
+                label=delta.label or f"Variant {i}",
+                profile={"age": profile.age, "income": profile.income, "category": profile.category},
+                eligible_count=len(eligible_ids),
+                gained=sorted(names[sid] for sid in eligible_ids - base_ids),
+                lost=sorted(names[sid] for sid in base_ids - eligible_ids),
+                near_misses=_near_misses(evaluation, by_id),
+            ))
+
+        return WhatIfResponse(
+            base_eligible=sorted(names[sid] for sid in base_ids),
+            base_near_misses=_near_misses(base_eval, by_id),
+            variants=variants,
+        )
+
+    except Exception as e:
+        logger.error(f"What-if eligibility error: {e}")
+        raise HTTPException(status_code=500, detail="What-if eligibility check failed.")
+
+
+def _near_misses(evaluation: dict, schemes_by_id: dict) -> list:
+    """Schemes that fail by exactly one criterion, with the requirement that was missed."""
+    misses = []
+    for sid, failed in evaluation.items():
+        if len(failed) == 1:
+            scheme = schemes_by_id[sid]
+            misses.append({
+                "name": scheme.name,
+                "failed_criterion": failed[0],
+                "requirement": eligibility_engine.describe_requirement(failed[0], scheme),
+            })
+    return sorted(misses, key=lambda m: m["name"])
@@ -0,0 +1,175 @@
+"""
+Media Router — Cache-friendly audio serving.
+Strong ETags, immutable caching for content-addressed files, HTTP Range requests
+for resumable/seekable playback, and precompressed (.br/.gz) variants when present.
+Backends that serve clients directly (S3) get a redirect instead of a proxied body.
+"""
+import os
+import re
+import hashlib
+import logging
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
+
+from services import speech_service
+from services.storage import get_storage
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+MEDIA_TYPES = {".mp3": "audio/mpeg", ".wav": "audio/wav"}
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))   # Preference order
+
+# Generated audio is named by a SHA-256 of (voice, lang, text) — its bytes never change
+_CONTENT_ADDRESSED_RE = re.compile(r"^[0-9a-f]{64}$")
+_SAFE_NAME_RE = re.compile(r"^[A-Za-z0-9_-]+\.(mp3|wav)$")
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+_ETAG_CACHE_SIZE = 4096
+
+# (key, modified, size) → strong ETag, so mutable blobs are hashed once per version
+_etag_cache: dict = {}
+
+
+@router.api_route("/static/audio/{name}", methods=["GET", "HEAD"], include_in_schema=False)
+def serve_audio(name: str, request: Request):
+    """
+    Serve a generated audio file with validators, Range support and long-lived caching.
+    A plain def: storage stats and ETag hashing are blocking I/O, so FastAPI runs it in
+    the threadpool instead of on the event loop.
+    """
+    if not _SAFE_NAME_RE.match(name):
+        raise HTTPException(status_code=404, detail="Not found.")
+
+    storage = get_storage()
+    key = speech_service.audio_key(name)
+    if storage.serves_directly:
+        return RedirectResponse(storage.url(key), status_code=307)
+
+    info = storage.stat(key)
+    if info is None:
+        raise HTTPException(status_code=404, detail="Not found.")
+
+    stem, ext = os.path.splitext(name)
+    etag = _etag(key, stem, info)
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Vary": "Accept-Encoding",
+        "Cache-Control": (
+            "public, max-age=31536000, immutable" if _CONTENT_ADDRESSED_RE.match(stem)
+            else "public, max-age=3600"
+        ),
+    }
+    media_type = MEDIA_TYPES[ext]
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and if_range and if_range != etag:
+        range_header = None  # Resource changed since the partial download — send it whole
+
+    # Conditional GET
+    if not range_header and _matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    # Precompressed variant (whole-file responses only)
+    if not range_header:
+        accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+        for encoding, suffix in PRECOMPRESSED:
+            variant = storage.stat(key + suffix) if accepted(encoding) else None
+            if variant:
+                variant_etag = f'{etag[:-1]}-{suffix[1:]}"'
+                if _matches(request.headers.get("if-none-match"), variant_etag):
+                    return Response(status_code=304, headers={**headers, "ETag": variant_etag})
+                return _blob_response(request, key + suffix, 0, variant.size, media_type, {
+                    **headers, "ETag": variant_etag, "Content-Encoding": encoding,
+                })
+
+    size = info.size
+    if range_header:
+        byte_range = _parse_range(range_header, size)
+        if byte_range is None:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        if byte_range != (0, size):
+            start, end = byte_range
+            return _blob_response(request, key, start, end, media_type, {
+                **headers, "Content-Range": f"bytes {start}-{end - 1}/{size}",
+            }, status_code=206)
+
+    return _blob_response(request, key, 0, size, media_type, headers)
+
+
+def _blob_response(request: Request, key: str, start: int, end: int,
+                   media_type: str, headers: dict, status_code: int = 200) -> Response:
+    headers = {**headers, "Content-Length": str(end - start)}
+    if request.method == "HEAD":
+        return Response(status_code=status_code, headers=headers, media_type=media_type)
+    return StreamingResponse(
+        get_storage().open(key, start, end), status_code=status_code, headers=headers, media_type=media_type
+    )
+
+
+def _parse_range(header: str, size: int):
+    """Parse a single `bytes=` range into [start, end). None if unsatisfiable; whole file if multi-range."""
+    if "," in header:
+        return (0, size)
+    match = _RANGE_RE.match(header.strip())
+    if not match or size == 0:
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last) + 1, size) if last else size
+    elif last:
+        start, end = max(size - int(last), 0), size
+    else:
+        return None
+    if start >= size or start >= end:
+        return None
+    return (start, end)
+
+
+def _etag(key: str, stem: str, info) -> str:
+    if _CONTENT_ADDRESSED_RE.match(stem):
+        return f'"{stem}"'
+    cache_key = (key, info.modified, info.size)
+    etag = _etag_cache.get(cache_key)
+    if etag is None:
+        digest = hashlib.sha256()
+        for chunk in get_storage().open(key):
+            digest.update(chunk)
+        etag = f'"{digest.hexdigest()}"'
+        if len(_etag_cache) >= _ETAG_CACHE_SIZE:
+            _etag_cache.clear()
+        _etag_cache[cache_key] = etag
+    return etag
+
+
+def _accepted_encodings(header: str):
+    """
+    Parse Accept-Encoding into a predicate: is this content-coding acceptable (q > 0)?
+    Codings not listed fall back to `*`; without `*` they are not acceptable.
+    """
+    qualities = {}
+    for item in header.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    return lambda encoding: qualities.get(encoding, qualities.get("*", 0.0)) > 0
+
+
+def _matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
@@ -0,0 +1,141 @@
+"""
+Schemes Router — Catalog browsing, search and typeahead for the frontend (no LLM involved).
+Catalog responses carry an ETag derived from the catalog version, so clients revalidate
+with If-None-Match and get 304 Not Modified while the catalog is unchanged.
+"""
+import hashlib
+import logging
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session
+
+from database import get_db
+from schemas import SchemePage, SchemeSearchResponse, SuggestResponse
+from services import catalog_service, search_service, suggest_service
+from persona_config import PERSONA_CATEGORIES
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+# Clients may store catalog responses but must revalidate before reuse
+_CATALOG_CACHE_CONTROL = "no-cache"
+
+
+@router.get("", response_model=SchemePage)
+async def list_schemes(
+    request: Request,
+    response: Response,
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: Optional[str] = Query(default=None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(default=None, description="Comma-separated, e.g. name,category,website"),
+    category: Optional[str] = None,
+    since_version: Optional[int] = Query(default=None, ge=0, description="Only changes after this catalog version"),
+    db: Session = Depends(get_db)
+):
+    """
+    Browse the scheme catalog in id order, one page at a time.
+    To sync offline: fetch everything once, keep catalog_version, and later pass it as
+    `since_version` to receive only added/changed schemes plus removed_ids.
+    """
+    version = catalog_service.current_version(db)
+    etag = _catalog_etag(version, request)
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=_cache_headers(etag))
+
+    try:
+        selected = catalog_service.parse_fields(fields)
+        page = catalog_service.list_schemes(db, selected, limit, cursor, category, since_version)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    response.headers.update(_cache_headers(etag))
+    return {"catalog_version": version, **page}
+
+
+@router.get("/search", response_model=SchemeSearchResponse)
+async def search_schemes(
+    q: str = Query(..., min_length=1, max_length=200),
+    category: Optional[str] = None,
+    persona: Optional[str] = Query(default=None, description="Limit to the categories relevant to a persona"),
+    limit: int = Query(default=20, ge=1, le=50),
+    offset: int = Query(default=0, ge=0, le=1000),
+    db: Session = Depends(get_db)
+):
+    """
+    Full-text search over scheme name, description, benefits and eligibility.
+    Results are ranked (name matches first) with a highlighted snippet.
+    Every word must match; the last letters of each word may be omitted (prefix match).
+    """
+    categories = None
+    if persona:
+        if persona not in PERSONA_CATEGORIES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid persona '{persona}'. Choose from: {', '.join(PERSONA_CATEGORIES)}",
+            )
+        categories = PERSONA_CATEGORIES[persona]
+    if category:
+        if categories is not None and category not in categories:
+            return {"query": q, "results": []}
+        categories = [category]
+
+    results = search_service.search_schemes(db, q, categories, limit, offset)
+    return {"query": q, "results": results}
+
+
+@router.get("/suggest", response_model=SuggestResponse)
+def suggest(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(default=8, ge=1, le=suggest_service.SUGGEST_TOP_K),
+):
+    """
+    Typeahead: scheme names, categories, topics and ready-made questions whose text
+    (or any word in it) starts with `prefix`, most popular first. Served from memory;
+    a plain def so the one-time initial trie build runs in the threadpool.
+    """
+    return {"prefix": prefix, "suggestions": suggest_service.suggest(prefix, limit)}
+
+
+@router.get("/{scheme_id}")
+async def get_scheme(
+    scheme_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(default=None, description="Comma-separated, e.g. name,category,website"),
+    db: Session = Depends(get_db)
+):
+    """One scheme, optionally projected to `fields`; revalidates with the catalog ETag."""
+    version = catalog_service.current_version(db)
+    etag = _catalog_etag(version, request)
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=_cache_headers(etag))
+
+    try:
+        selected = catalog_service.parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    scheme = catalog_service.get_scheme(db, scheme_id, selected)
+    if not scheme:
+        raise HTTPException(status_code=404, detail="Scheme not found.")
+
+    response.headers.update(_cache_headers(etag))
+    return scheme
+
+
+def _catalog_etag(version: int, request: Request) -> str:
+    """Catalog version plus a digest of the query, since each page/projection is its own representation."""
+    params = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    digest = hashlib.sha256(f"{request.url.path}?{params}".encode()).hexdigest()[:16]
+    return f'"catalog-v{version}-{digest}"'
+
+
+def _cache_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": _CATALOG_CACHE_CONTROL}
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
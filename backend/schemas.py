@@ -40,6 +40,38 @@ class SchemeResponse(SchemeCreate):
         from_attributes = True
 
 
+class SchemePage(BaseModel):
+    catalog_version: int
+    items: List[dict]             # Only the requested fields (plus id)
+    next_cursor: Optional[str] = None
+    removed_ids: List[int] = []   # With since_version (first page only): schemes deleted since then
+
+
+class SchemeSearchResult(BaseModel):
+    id: int
+    name: str
+    category: Optional[str] = None
+    website: Optional[str] = None
+    snippet: Optional[str] = None  # HTML-escaped matched text, terms wrapped in <b>…</b>
+    score: float                  # Higher is more relevant
+
+
+class SchemeSearchResponse(BaseModel):
+    query: str
+    results: List[SchemeSearchResult]
+
+
+class Suggestion(BaseModel):
+    text: str
+    kind: str                     # scheme / category / query / topic
+    scheme_id: Optional[int] = None
+
+
+class SuggestResponse(BaseModel):
+    prefix: str
+    suggestions: List[Suggestion]
+
+
 # ─── Eligibility ─────────────────────────────────────────────────
 
 class EligibilityCriteria(BaseModel):
@@ -57,6 +89,33 @@ class EligibilityResponse(BaseModel):
     total_found: int
 
 
+class ProfileDelta(BaseModel):
+    label: Optional[str] = None                    # e.g. "Income +₹50k"
+    income_change: float = 0
+    age_change: int = 0
+    category: Optional[str] = None                 # Replaces the base category if set
+
+
+class WhatIfRequest(BaseModel):
+    base: EligibilityCriteria
+    deltas: List[ProfileDelta] = Field(..., min_length=1, max_length=20)
+
+
+class WhatIfVariant(BaseModel):
+    label: str
+    profile: dict
+    eligible_count: int
+    gained: List[str]
+    lost: List[str]
+    near_misses: List[dict]
+
+
+class WhatIfResponse(BaseModel):
+    base_eligible: List[str]
+    base_near_misses: List[dict]
+    variants: List[WhatIfVariant]
+
+
 # ─── Document ────────────────────────────────────────────────────
 
 class AnalysisResponse(BaseModel):
@@ -66,6 +125,26 @@ class AnalysisResponse(BaseModel):
     next_steps: str
 
 
+class BatchAnalysisItem(BaseModel):
+    index: int                    # Position of the file in the archive
+    filename: str
+    result: Optional[AnalysisResponse] = None
+    error: Optional[str] = None
+
+
+class DocumentJobStatus(BaseModel):
+    job_id: str
+    filename: Optional[str] = None
+    status: str                   # queued / running / done / failed
+    pages_done: int = 0
+    pages_total: int = 0
+    chunks_done: int = 0
+    chunks_total: int = 0
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
 # ─── Skills & Jobs ───────────────────────────────────────────────
 
 class SkillJobInput(BaseModel):
@@ -102,3 +181,17 @@ class PersonaUsageResponse(BaseModel):
     most_selected_persona: Optional[str] = None
     persona_counts: dict = {}
     top_topics_per_persona: dict = {}
+
+
+class VolumeBucket(BaseModel):
+    start: datetime
+    total: int = 0
+    by_persona: dict = {}
+    by_category: dict = {}
+
+
+class VolumeResponse(BaseModel):
+    interval: str                 # hour / day / week
+    since: datetime               # Window widened to whole buckets
+    until: datetime
+    buckets: List[VolumeBucket]
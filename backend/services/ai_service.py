@@ -3,9 +3,13 @@ AI Service — Groq / OpenAI API integration with graceful fallbacks.
 All functions work without an API key by returning mock responses.
 """
 import os
+import re
 import json
+import asyncio
+import hashlib
 import logging
-from typing import List, Dict, Any
+from collections import OrderedDict
+from typing import List, Dict, Any, AsyncIterator, Callable, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -68,6 +72,44 @@ SYSTEM_SIMPLIFY = (
     "Add bullet points for key steps. Keep it under 250 words."
 )
 
+SYSTEM_SIMPLIFY_CHUNK = (
+    "You are simplifying one section of a longer government document. "
+    "Summarize it in simple words (Grade 5 level). Keep every concrete fact: "
+    "amounts, dates, deadlines, eligibility rules, required documents and offices. "
+    "Keep it under 120 words."
+)
+
+SYSTEM_REDUCE = (
+    "You are a clear language expert. You are given simplified summaries of consecutive "
+    "sections of one government document. Combine them into a single simple explanation "
+    "(Grade 5 level) of the whole document. Remove repetition and jargon. "
+    "Add bullet points for key steps. Keep it under 250 words."
+)
+
+SYSTEM_NEXT_STEPS = "Extract 3-5 actionable next steps from this document. Be specific and simple."
+
+SYSTEM_ANALYZE = (
+    SYSTEM_SIMPLIFY + " Also extract 3-5 actionable next steps from the document. "
+    "Return ONLY a JSON object with two string keys: 'simplification' (the simple "
+    "rewrite) and 'next_steps' (a numbered list, one step per line)."
+)
+
+# Long-document pipeline settings
+DOC_CHUNK_CHARS = int(os.getenv("DOC_CHUNK_CHARS", "3000"))
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "4"))
+_CHUNK_CACHE_SIZE = 2048
+
+# Bump to invalidate stored document analyses without changing prompts or model
+ANALYSIS_CACHE_SALT = os.getenv("ANALYSIS_CACHE_SALT", "")
+
+_llm_semaphore = asyncio.Semaphore(LLM_CONCURRENCY)
+_chunk_cache: "OrderedDict[str, str]" = OrderedDict()
+_chunk_inflight: Dict[str, "asyncio.Future[str]"] = {}
+
+
+class _FallbackText(str):
+    """Canned or raw text returned in place of an LLM result; marks an analysis as degraded."""
+
 # Language support configuration
 LANGUAGE_INSTRUCTIONS = {
     "en": "Respond in English.",
@@ -159,6 +201,39 @@ async def generate_conversational_response(
         return _fallback_response(user_query, context)
 
 
+async def stream_conversational_response(
+    user_query: str, context: str, persona: str | None = None, language: str = "en"
+) -> AsyncIterator[str]:
+    """Stream the conversational response as text deltas (a single chunk when using fallbacks)."""
+    client = _get_client()
+    if not client:
+        yield _fallback_response(user_query, context)
+        return
+
+    system_prompt = _build_system_prompt(persona, language)
+    sent_any = False
+    try:
+        stream = await client.chat.completions.create(
+            model=AI_MODEL,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": f"Context:\n{context}\n\nUser Question: {user_query}"}
+            ],
+            temperature=0.7,
+            max_tokens=500,
+            stream=True
+        )
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                sent_any = True
+                yield delta
+    except Exception as e:
+        logger.error(f"stream_response error: {e}")
+        if not sent_any:
+            yield _fallback_response(user_query, context)
+
+
 async def match_schemes(user_query: str, schemes: list) -> List[int]:
     """Use AI to find relevant schemes from a list."""
     client = _get_client()
@@ -186,26 +261,44 @@ async def match_schemes(user_query: str, schemes: list) -> List[int]:
         return []
 
 
-async def simplify_text(text: str) -> str:
-    """Simplify complex government text to Grade 5 reading level."""
+async def simplify_text(text: str, partials: Optional[List[str]] = None) -> str:
+    """
+    Simplify complex government text to Grade 5 reading level.
+    Short texts take one call; long ones are map-reduced over chunks (see map_document).
+    """
     client = _get_client()
     if not client:
-        return f"Here is a simpler version of the document:\n\n{text[:500]}..."
+        return _FallbackText(f"Here is a simpler version of the document:\n\n{text[:500]}...")
 
     try:
+        if len(text) <= DOC_CHUNK_CHARS:
+            response = await client.chat.completions.create(
+                model=AI_MODEL,
+                messages=[
+                    {"role": "system", "content": SYSTEM_SIMPLIFY},
+                    {"role": "user", "content": text}
+                ],
+                temperature=0.5,
+                max_tokens=600
+            )
+            return response.choices[0].message.content
+
+        partials = partials or await _map_chunks(split_into_chunks(text))
+        combined = await _collapse_partials(partials)
         response = await client.chat.completions.create(
             model=AI_MODEL,
             messages=[
-                {"role": "system", "content": SYSTEM_SIMPLIFY},
-                {"role": "user", "content": text[:3000]}  # Limit context
+                {"role": "system", "content": SYSTEM_REDUCE},
+                {"role": "user", "content": combined}
             ],
             temperature=0.5,
             max_tokens=600
         )
-        return response.choices[0].message.content
+        result = response.choices[0].message.content
+        return _FallbackText(result) if isinstance(combined, _FallbackText) else result
     except Exception as e:
         logger.error(f"simplify_text error: {e}")
-        return f"Here is a simpler version of the document:\n\n{text[:500]}..."
+        return _FallbackText(f"Here is a simpler version of the document:\n\n{text[:500]}...")
 
 
 async def explain_eligibility(user_profile: dict, eligible_schemes: list) -> str:
@@ -295,26 +388,264 @@ async def recommend_skills(education: str, interest: str, location: str) -> dict
         return fallback
 
 
-async def generate_next_steps(text: str) -> str:
-    """Generate actionable next steps from a document."""
+async def generate_next_steps(text: str, partials: Optional[List[str]] = None) -> str:
+    """Generate actionable next steps from a document (long documents use the chunk summaries)."""
     client = _get_client()
     if not client:
-        return "1. Read through the document carefully.\n2. Note any deadlines mentioned.\n3. Gather the required documents.\n4. Visit your nearest government office or CSC for help."
+        return _FallbackText(
+            "1. Read through the document carefully.\n2. Note any deadlines mentioned.\n"
+            "3. Gather the required documents.\n4. Visit your nearest government office or CSC for help."
+        )
 
     try:
+        if len(text) > DOC_CHUNK_CHARS:
+            partials = partials or await _map_chunks(split_into_chunks(text))
+            text = await _collapse_partials(partials)
+
         response = await client.chat.completions.create(
             model=AI_MODEL,
             messages=[
-                {"role": "system", "content": "Extract 3-5 actionable next steps from this document. Be specific and simple."},
-                {"role": "user", "content": text[:2000]}
+                {"role": "system", "content": SYSTEM_NEXT_STEPS},
+                {"role": "user", "content": text}
             ],
             temperature=0.5,
             max_tokens=300
         )
-        return response.choices[0].message.content
+        result = response.choices[0].message.content
+        return _FallbackText(result) if isinstance(text, _FallbackText) else result
     except Exception as e:
         logger.error(f"generate_next_steps error: {e}")
-        return "1. Read the document carefully.\n2. Note deadlines.\n3. Visit your nearest CSC."
+        return _FallbackText("1. Read the document carefully.\n2. Note deadlines.\n3. Visit your nearest CSC.")
+
+
+def analysis_version() -> Optional[str]:
+    """
+    Fingerprint of everything that shapes a document analysis (model, prompts, chunking).
+    Stored analyses are only reused when this matches. None when no AI client is
+    configured, so fallback text is never served as a cached result.
+    """
+    if not _get_client():
+        return None
+    parts = [
+        AI_MODEL, SYSTEM_SIMPLIFY, SYSTEM_SIMPLIFY_CHUNK, SYSTEM_REDUCE,
+        SYSTEM_NEXT_STEPS, SYSTEM_ANALYZE, str(DOC_CHUNK_CHARS), ANALYSIS_CACHE_SALT,
+    ]
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def clear_chunk_cache():
+    """Drop all cached chunk summaries."""
+    _chunk_cache.clear()
+
+
+async def analyze_document_text(text: str, partials: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Produce {simplification, next_steps, degraded} for a document in one round trip.
+    Short documents use a single structured call; long ones reduce both fields concurrently.
+    Any field the fused call fails to return falls back to its dedicated function.
+    `degraded` is True when any part came from a fallback rather than the model.
+    """
+    client = _get_client()
+    if not client or len(text) > DOC_CHUNK_CHARS:
+        simplification, next_steps = await asyncio.gather(
+            simplify_text(text, partials),
+            generate_next_steps(text, partials),
+        )
+        return _with_degraded({"simplification": simplification, "next_steps": next_steps})
+
+    result: Dict[str, Any] = {}
+    try:
+        response = await client.chat.completions.create(
+            model=AI_MODEL,
+            messages=[
+                {"role": "system", "content": SYSTEM_ANALYZE},
+                {"role": "user", "content": text}
+            ],
+            temperature=0.5,
+            max_tokens=900,
+            response_format={"type": "json_object"}
+        )
+        result = json.loads(response.choices[0].message.content)
+        if not isinstance(result, dict):
+            result = {}
+    except Exception as e:
+        logger.error(f"analyze_document_text error: {e}")
+
+    fallbacks = {"simplification": simplify_text, "next_steps": generate_next_steps}
+    fields = {key: result.get(key) for key in fallbacks}
+    missing = [key for key, value in fields.items() if not isinstance(value, str) or not value.strip()]
+    for key, value in zip(missing, await asyncio.gather(*(fallbacks[k](text) for k in missing))):
+        fields[key] = value
+    return _with_degraded(fields)
+
+
+def _with_degraded(fields: Dict[str, Any]) -> Dict[str, Any]:
+    fields["degraded"] = any(isinstance(value, _FallbackText) for value in fields.values())
+    return fields
+
+
+# ─── Long-Document Map-Reduce ────────────────────────────────────
+
+_HEADING_RE = re.compile(
+    r"^\s*(?:(?:section|chapter|part|annexure|schedule)\b|[0-9IVX]+[.)]\s|[A-Z][A-Z0-9 ,&()/-]{3,}$)",
+    re.IGNORECASE,
+)
+
+
+def split_into_chunks(text: str, max_chars: int = DOC_CHUNK_CHARS) -> List[str]:
+    """
+    Split text into chunks of at most `max_chars`, preferring section and paragraph boundaries.
+    A heading starts a new chunk once the current one is at least half full; paragraphs
+    longer than a chunk are split on sentence boundaries (hard-split as a last resort).
+    """
+    chunks: List[str] = []
+    current = ""
+
+    for para in (p.strip() for p in re.split(r"\n\s*\n", text)):
+        if not para:
+            continue
+        starts_section = bool(_HEADING_RE.match(para.splitlines()[0]))
+        if current and (
+            len(current) + len(para) + 2 > max_chars
+            or (starts_section and len(current) >= max_chars // 2)
+        ):
+            chunks.append(current)
+            current = ""
+
+        if len(para) > max_chars:
+            for piece in _split_long_paragraph(para, max_chars):
+                if current and len(current) + len(piece) + 1 > max_chars:
+                    chunks.append(current)
+                    current = ""
+                current = f"{current} {piece}".strip()
+            continue
+
+        current = f"{current}\n\n{para}" if current else para
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _split_long_paragraph(para: str, max_chars: int) -> List[str]:
+    pieces = []
+    for sentence in re.split(r"(?<=[.!?।])\s+", para):
+        while len(sentence) > max_chars:
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if sentence:
+            pieces.append(sentence)
+    return pieces
+
+
+async def map_document(
+    parts: AsyncIterator[str], progress: Optional[Callable[[str, int, int], None]] = None
+) -> Tuple[str, List[str]]:
+    """
+    Consume document text as it streams in (e.g. PDF page ranges) and start simplifying
+    each chunk as soon as it is complete. Returns (full_text, chunk_summaries).
+    Summaries are empty for documents that fit in a single chunk or when no AI client is set.
+    `progress("chunks", done, scheduled)` is called as chunk summaries finish.
+    """
+    client = _get_client()
+    collected: List[str] = []
+    tasks: List[asyncio.Task] = []
+    pending = ""
+
+    def schedule(chunks: List[str]):
+        for chunk in chunks:
+            task = asyncio.create_task(_simplify_chunk(chunk))
+            if progress:
+                task.add_done_callback(
+                    lambda _t: progress("chunks", sum(t.done() for t in tasks), len(tasks))
+                )
+            tasks.append(task)
+
+    try:
+        async for part in parts:
+            if not part:
+                continue
+            collected.append(part)
+            pending = f"{pending}\n\n{part}" if pending else part
+            if client and len(pending) > 2 * DOC_CHUNK_CHARS:
+                # Keep the last chunk back — the next part may continue it
+                *ready, pending = split_into_chunks(pending)
+                schedule(ready)
+
+        if client and (tasks or len(pending) > DOC_CHUNK_CHARS):
+            schedule(split_into_chunks(pending))
+        partials = list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    return "\n".join(collected).strip(), partials
+
+
+async def _map_chunks(chunks: List[str]) -> List[str]:
+    """Simplify chunks concurrently (bounded by LLM_CONCURRENCY), preserving order."""
+    return list(await asyncio.gather(*(_simplify_chunk(c) for c in chunks)))
+
+
+async def _simplify_chunk(chunk: str, system_prompt: str = SYSTEM_SIMPLIFY_CHUNK) -> str:
+    """
+    Simplify one chunk through the shared client, cached by content hash.
+    Concurrent misses for the same chunk share one in-flight call.
+    """
+    key = hashlib.sha256(f"{AI_MODEL}\n{system_prompt}\n{chunk}".encode("utf-8")).hexdigest()
+    if key in _chunk_cache:
+        _chunk_cache.move_to_end(key)
+        return _chunk_cache[key]
+
+    inflight = _chunk_inflight.get(key)
+    if inflight is None:
+        inflight = asyncio.ensure_future(_summarize_chunk(key, chunk, system_prompt))
+        _chunk_inflight[key] = inflight
+        inflight.add_done_callback(lambda _f: _chunk_inflight.pop(key, None))
+    # Shielded so one cancelled caller does not cancel the call the others are waiting on
+    return await asyncio.shield(inflight)
+
+
+async def _summarize_chunk(key: str, chunk: str, system_prompt: str) -> str:
+    client = _get_client()
+    try:
+        async with _llm_semaphore:
+            response = await client.chat.completions.create(
+                model=AI_MODEL,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": chunk}
+                ],
+                temperature=0.3,
+                max_tokens=250
+            )
+        result = response.choices[0].message.content
+    except Exception as e:
+        logger.error(f"simplify chunk error: {e}")
+        return _FallbackText(chunk[:400])  # Not cached, so a later upload retries
+
+    _chunk_cache[key] = result
+    if len(_chunk_cache) > _CHUNK_CACHE_SIZE:
+        _chunk_cache.popitem(last=False)
+    return result
+
+
+async def _collapse_partials(partials: List[str]) -> str:
+    """
+    Merge chunk summaries until they fit in one prompt, summarizing groups if needed.
+    Returns a _FallbackText when any summary along the way was a fallback.
+    """
+    degraded = any(isinstance(p, _FallbackText) for p in partials)
+    combined = "\n\n".join(partials)
+    while len(combined) > 2 * DOC_CHUNK_CHARS and len(partials) > 1:
+        groups = split_into_chunks(combined, 2 * DOC_CHUNK_CHARS)
+        if len(groups) >= len(partials):
+            break  # Not shrinking any more — let the final call see what fits
+        partials = list(await asyncio.gather(*(_simplify_chunk(g) for g in groups)))
+        degraded = degraded or any(isinstance(p, _FallbackText) for p in partials)
+        combined = "\n\n".join(partials)
+    return _FallbackText(combined) if degraded else combined
 
 
 # ─── Fallback Helpers ────────────────────────────────────────────
@@ -0,0 +1,513 @@
+"""
+Analytics Service — Rollup tables maintained on write.
+Logging an interaction or analysis bumps the matching counters in the same transaction,
+so dashboard endpoints read a handful of small rows instead of scanning history.
+"""
+import io
+import csv
+import json
+import heapq
+import base64
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator, Optional, Tuple
+
+from sqlalchemy import and_, func, literal_column, or_, union_all
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from services import retention_service
+
+from models import (
+    AnalyticsTotal, CategoryRollup, PersonaRollup, PersonaCategoryRollup,
+    Interaction, SearchHistory, SearchHistoryMatch, DocumentAnalysis, Scheme,
+    InteractionArchive, SearchHistoryArchive, ArchivedSchemeMatchCount,
+)
+
+logger = logging.getLogger(__name__)
+
+TOTAL_QUERIES = "queries"
+TOTAL_DOCUMENTS = "documents"
+
+HISTORY_EXPORT_FIELDS = ("id", "query", "category", "persona", "matched_schemes", "timestamp")
+_EXPORT_BATCH = 1000
+
+# Query-volume buckets
+VOLUME_INTERVALS = {"hour": timedelta(hours=1), "day": timedelta(days=1), "week": timedelta(weeks=1)}
+VOLUME_DEFAULT_WINDOW = {"hour": timedelta(days=2), "day": timedelta(days=30), "week": timedelta(weeks=26)}
+VOLUME_MAX_BUCKETS = 2000
+_SQLITE_BUCKET_FORMATS = {
+    "hour": ("%Y-%m-%d %H:00:00",),
+    "day": ("%Y-%m-%d 00:00:00",),
+    "week": ("%Y-%m-%d 00:00:00", "weekday 0", "-6 days"),   # Monday, like date_trunc('week')
+}
+_VOLUME_CACHE_SIZE = 20000
+
+# (interval, bucket start) → counts, only for buckets that have fully elapsed
+_volume_cache: "OrderedDict[tuple, dict]" = OrderedDict()
+_volume_lock = threading.Lock()
+
+
+def record_interaction(db: Session, persona: Optional[str], category: Optional[str]):
+    """Count one interaction (and its search-history entry). The caller commits."""
+    _increment(db, AnalyticsTotal, name=TOTAL_QUERIES)
+    if persona:
+        _increment(db, PersonaRollup, persona=persona)
+    if category:
+        _increment(db, CategoryRollup, category=category)
+    if persona and category:
+        _increment(db, PersonaCategoryRollup, persona=persona, category=category)
+
+
+def record_document(db: Session):
+    """Count one stored document analysis. The caller commits."""
+    _increment(db, AnalyticsTotal, name=TOTAL_DOCUMENTS)
+
+
+# Match row for a backfilled history entry whose names resolved to no scheme, so it is not rescanned
+UNRESOLVED_SCHEME_ID = 0
+
+
+def record_scheme_matches(db: Session, search_id: int, scheme_ids: Iterable[int]):
+    """Store the schemes matched by a search-history entry. The caller commits."""
+    db.add_all(
+        SearchHistoryMatch(search_id=search_id, scheme_id=scheme_id)
+        for scheme_id in dict.fromkeys(scheme_ids)
+    )
+
+
+def record_archived_matches(db: Session, counts: dict):
+    """Fold {scheme_id: matches} from archived history into the archived counts. The caller commits."""
+    for scheme_id, count in counts.items():
+        _increment(db, ArchivedSchemeMatchCount, count, scheme_id=scheme_id)
+
+
+def top_schemes(db: Session, limit: int = 10) -> list:
+    """
+    [(scheme name, match count)], most matched first — one aggregate over the scheme_id
+    index, plus the counts folded in from archived history.
+    """
+    counts = _scheme_match_counts(db)
+    return (
+        db.query(Scheme.name, counts.c.matches)
+        .join(counts, Scheme.id == counts.c.scheme_id)
+        .order_by(counts.c.matches.desc(), Scheme.name)
+        .limit(limit)
+        .all()
+    )
+
+
+def scheme_match_counts(db: Session) -> dict:
+    """{scheme_id: times matched}, live and archived history combined."""
+    counts = _scheme_match_counts(db)
+    return {scheme_id: int(matches) for scheme_id, matches in db.query(counts.c.scheme_id, counts.c.matches)}
+
+
+def _scheme_match_counts(db: Session):
+    live = (
+        db.query(SearchHistoryMatch.scheme_id.label("scheme_id"), func.count().label("matches"))
+        .filter(SearchHistoryMatch.scheme_id != UNRESOLVED_SCHEME_ID)
+        .group_by(SearchHistoryMatch.scheme_id)
+    )
+    archived = db.query(
+        ArchivedSchemeMatchCount.scheme_id.label("scheme_id"), ArchivedSchemeMatchCount.count.label("matches")
+    )
+    combined = union_all(live, archived).subquery()
+    return (
+        db.query(combined.c.scheme_id, func.sum(combined.c.matches).label("matches"))
+        .group_by(combined.c.scheme_id)
+        .subquery()
+    )
+
+
+def backfill_scheme_matches(db: Session, batch_size: int = 1000) -> int:
+    """
+    Create match rows for search-history entries logged before the table existed,
+    resolving the comma-separated names against the scheme catalog. Entries with no
+    resolvable name get an UNRESOLVED_SCHEME_ID row, so each entry is scanned once.
+    Safe to re-run.
+    """
+    names = sorted(((name, id_) for id_, name in db.query(Scheme.id, Scheme.name)), key=lambda x: -len(x[0]))
+    pending = (
+        db.query(SearchHistory.id, SearchHistory.matched_schemes)
+        .outerjoin(SearchHistoryMatch, SearchHistoryMatch.search_id == SearchHistory.id)
+        .filter(SearchHistory.matched_schemes.isnot(None), SearchHistoryMatch.search_id.is_(None))
+        .order_by(SearchHistory.id)
+    )
+    last_id, filled = 0, 0
+    while True:
+        rows = pending.filter(SearchHistory.id > last_id).limit(batch_size).all()
+        if not rows:
+            break
+        for search_id, matched in rows:
+            record_scheme_matches(db, search_id, _resolve_names(matched, names) or [UNRESOLVED_SCHEME_ID])
+            filled += 1
+        last_id = rows[-1][0]
+        db.commit()
+    if filled:
+        logger.info(f"Backfilled scheme matches for {filled} search-history entries.")
+    return filled
+
+
+def get_total(db: Session, name: str) -> int:
+    row = db.get(AnalyticsTotal, name)
+    return row.count if row else 0
+
+
+def category_counts(db: Session) -> dict:
+    return {row.category: row.count for row in db.query(CategoryRollup).all()}
+
+
+def persona_counts(db: Session) -> dict:
+    """{persona: count}, most used first."""
+    rows = db.query(PersonaRollup).order_by(PersonaRollup.count.desc(), PersonaRollup.persona).all()
+    return {row.persona: row.count for row in rows}
+
+
+def top_categories_per_persona(db: Session, limit: int = 3) -> dict:
+    rows = (
+        db.query(PersonaCategoryRollup)
+        .order_by(PersonaCategoryRollup.persona, PersonaCategoryRollup.count.desc(), PersonaCategoryRollup.category)
+        .all()
+    )
+    top: dict[str, list[str]] = {}
+    for row in rows:
+        categories = top.setdefault(row.persona, [])
+        if len(categories) < limit:
+            categories.append(row.category)
+    return top
+
+
+def summary_snapshot(db: Session) -> dict:
+    """Dashboard summary: totals and breakdowns from the rollups plus the latest queries."""
+    recent = (
+        db.query(Interaction)
+        .order_by(Interaction.timestamp.desc())
+        .limit(10)
+        .all()
+    )
+    return {
+        "total_queries": get_total(db, TOTAL_QUERIES),
+        "total_documents": get_total(db, TOTAL_DOCUMENTS),
+        "total_schemes": db.query(func.count(Scheme.id)).scalar(),
+        "category_breakdown": category_counts(db),
+        "persona_breakdown": persona_counts(db),
+        "recent_queries": [
+            {
+                "query": i.query,
+                "response": _preview(retention_service.response_text(i)),
+                "persona": i.persona,
+                "timestamp": str(i.timestamp)
+            }
+            for i in recent
+        ],
+    }
+
+
+def _preview(text: Optional[str], limit: int = 100) -> Optional[str]:
+    return text[:limit] + "..." if text and len(text) > limit else text
+
+
+def persona_usage_snapshot(db: Session) -> dict:
+    counts = persona_counts(db)
+    return {
+        "most_selected_persona": next(iter(counts), None),
+        "persona_counts": counts,
+        "top_topics_per_persona": top_categories_per_persona(db),
+    }
+
+
+def history_queries(db: Session, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                    persona: Optional[str] = None, category: Optional[str] = None) -> list:
+    """
+    Search history filtered to [since, until) and optionally one persona/category, as one
+    query per table: live search_history and search_history_archive (entries older than
+    RETENTION_ARCHIVE_DAYS). Returns [(model, query), ...].
+    """
+    since, until = utc_naive(since), utc_naive(until)
+    queries = []
+    for model in (SearchHistory, SearchHistoryArchive):
+        query = db.query(model)
+        if since:
+            query = query.filter(model.timestamp >= since)
+        if until:
+            query = query.filter(model.timestamp < until)
+        if persona:
+            query = query.filter(model.persona == persona)
+        if category:
+            query = query.filter(model.category == category)
+        queries.append((model, query))
+    return queries
+
+
+def history_page(db: Session, limit: int, cursor: Optional[str] = None, **filters) -> Tuple[list, Optional[str]]:
+    """
+    One page of history (live and archived), newest first, seeking past `cursor` on
+    (timestamp, id) instead of using OFFSET. Each table returns at most limit + 1 rows
+    from its index; the two are merged. Returns (rows, next cursor or None).
+    """
+    position = decode_cursor(cursor) if cursor else None
+    rows = []
+    for model, query in history_queries(db, **filters):
+        if position:
+            timestamp, last_id = position
+            query = query.filter(or_(
+                model.timestamp < timestamp,
+                and_(model.timestamp == timestamp, model.id < last_id),
+            ))
+        rows += query.order_by(model.timestamp.desc(), model.id.desc()).limit(limit + 1).all()
+    rows.sort(key=_history_order, reverse=True)
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def _history_order(entry) -> Tuple[datetime, int]:
+    return entry.timestamp, entry.id
+
+
+def encode_cursor(entry) -> str:
+    raw = f"{entry.timestamp.isoformat()}|{entry.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor; raises ValueError on anything malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, last_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(timestamp), int(last_id)
+    except Exception:
+        raise ValueError("Invalid cursor.")
+
+
+def history_row(entry) -> dict:
+    """JSON/CSV row for a SearchHistory or SearchHistoryArchive entry."""
+    return {
+        "id": entry.id,
+        "query": entry.query_text,
+        "category": entry.category,
+        "persona": entry.persona,
+        "matched_schemes": entry.matched_schemes,
+        "timestamp": str(entry.timestamp),
+    }
+
+
+def iter_history_export(fmt: str = "ndjson", **filters) -> Iterator[str]:
+    """
+    Stream the filtered history (live and archived) oldest first as CSV or NDJSON.
+    Uses its own session and one server-side cursor (yield_per) per table, merged in
+    order, so memory stays flat however many months are exported.
+    """
+    with SessionLocal() as db:
+        rows = heapq.merge(*(
+            query.order_by(model.timestamp, model.id)
+            .execution_options(stream_results=True)
+            .yield_per(_EXPORT_BATCH)
+            for model, query in history_queries(db, **filters)
+        ), key=_history_order)
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=HISTORY_EXPORT_FIELDS)
+            writer.writeheader()
+            for i, entry in enumerate(rows, 1):
+                writer.writerow(history_row(entry))
+                if i % _EXPORT_BATCH == 0:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue()
+        else:
+            batch = []
+            for entry in rows:
+                batch.append(json.dumps(history_row(entry), ensure_ascii=False) + "\n")
+                if len(batch) >= _EXPORT_BATCH:
+                    yield "".join(batch)
+                    batch = []
+            if batch:
+                yield "".join(batch)
+
+
+def query_volume(db: Session, interval: str, since: Optional[datetime] = None,
+                 until: Optional[datetime] = None, now: Optional[datetime] = None) -> dict:
+    """
+    Query counts per hour/day/week with persona and category breakdowns.
+    The window is widened to whole buckets. Buckets that have fully elapsed are cached,
+    so only the uncached span (normally just the latest buckets) is aggregated in SQL,
+    as a range scan on the timestamp index.
+    """
+    step = VOLUME_INTERVALS[interval]
+    # Timestamps are stored as naive UTC; bring offset-aware bounds onto that scale
+    since, until, now = utc_naive(since), utc_naive(until), utc_naive(now) or datetime.utcnow()
+    until = until or now
+    since = since or until - VOLUME_DEFAULT_WINDOW[interval]
+    start = floor_bucket(since, interval)
+    end = floor_bucket(until, interval)
+    if end < until:
+        end += step
+    if start >= end:
+        raise ValueError("`since` must be before `until`.")
+    if (end - start) / step > VOLUME_MAX_BUCKETS:
+        raise ValueError(f"Window spans more than {VOLUME_MAX_BUCKETS} {interval} buckets.")
+
+    starts = []
+    bucket = start
+    while bucket < end:
+        starts.append(bucket)
+        bucket += step
+
+    with _volume_lock:
+        cached = {b: _volume_cache[(interval, b)] for b in starts if (interval, b) in _volume_cache}
+    missing = [b for b in starts if b not in cached]
+    if missing:
+        fresh = _aggregate_volume(db, interval, missing[0], missing[-1] + step)
+        with _volume_lock:
+            for b in missing:
+                counts = fresh.get(b) or _empty_bucket()
+                cached[b] = counts
+                if b + step <= now:
+                    _volume_cache[(interval, b)] = counts
+            while len(_volume_cache) > _VOLUME_CACHE_SIZE:
+                _volume_cache.popitem(last=False)
+
+    return {
+        "interval": interval,
+        "since": start,
+        "until": end,
+        "buckets": [{"start": b, **cached[b]} for b in starts],
+    }
+
+
+def utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert an offset-aware datetime to naive UTC (how timestamps are stored); naive values pass through."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def floor_bucket(value: datetime, interval: str) -> datetime:
+    """Start of the bucket containing `value` (weeks start on Monday; aware values are converted to UTC)."""
+    value = utc_naive(value).replace(minute=0, second=0, microsecond=0)
+    if interval == "hour":
+        return value
+    value = value.replace(hour=0)
+    if interval == "week":
+        value -= timedelta(days=value.weekday())
+    return value
+
+
+def _bucket_expression(db: Session, interval: str, column):
+    if db.get_bind().dialect.name == "postgresql":
+        return func.date_trunc(interval, column)
+    fmt, *modifiers = _SQLITE_BUCKET_FORMATS[interval]
+    return func.strftime(fmt, column, *modifiers)
+
+
+def _aggregate_volume(db: Session, interval: str, start: datetime, end: datetime) -> dict:
+    buckets: dict = {}
+    for model in (SearchHistory, SearchHistoryArchive):   # Archived history still counts
+        bucket = _bucket_expression(db, interval, model.timestamp).label("bucket")
+        rows = (
+            db.query(bucket, model.persona, model.category, func.count().label("n"))
+            .filter(model.timestamp >= start, model.timestamp < end)
+            .group_by(literal_column("bucket"), model.persona, model.category)
+            .all()
+        )
+        for value, persona, category, count in rows:
+            if isinstance(value, str):
+                value = datetime.fromisoformat(value)
+            counts = buckets.setdefault(value.replace(tzinfo=None), _empty_bucket())
+            counts["total"] += count
+            if persona:
+                counts["by_persona"][persona] = counts["by_persona"].get(persona, 0) + count
+            if category:
+                counts["by_category"][category] = counts["by_category"].get(category, 0) + count
+    return buckets
+
+
+def _empty_bucket() -> dict:
+    return {"total": 0, "by_persona": {}, "by_category": {}}
+
+
+def rebuild_rollups(db: Session):
+    """Recompute every rollup from the source tables, live and archived (backfill or repair)."""
+    for model in (AnalyticsTotal, CategoryRollup, PersonaRollup, PersonaCategoryRollup):
+        db.query(model).delete(synchronize_session=False)
+
+    queries, categories, personas, persona_categories = 0, {}, {}, {}
+    for model in (Interaction, InteractionArchive):
+        queries += db.query(func.count(model.id)).scalar()
+        for persona, count in (
+            db.query(model.persona, func.count(model.id))
+            .filter(model.persona.isnot(None))
+            .group_by(model.persona)
+        ):
+            personas[persona] = personas.get(persona, 0) + count
+
+    for model in (SearchHistory, SearchHistoryArchive):
+        for category, count in (
+            db.query(model.category, func.count(model.id))
+            .filter(model.category.isnot(None))
+            .group_by(model.category)
+        ):
+            categories[category] = categories.get(category, 0) + count
+        for persona, category, count in (
+            db.query(model.persona, model.category, func.count(model.id))
+            .filter(model.persona.isnot(None), model.category.isnot(None))
+            .group_by(model.persona, model.category)
+        ):
+            key = (persona, category)
+            persona_categories[key] = persona_categories.get(key, 0) + count
+
+    db.add(AnalyticsTotal(name=TOTAL_QUERIES, count=queries))
+    db.add(AnalyticsTotal(name=TOTAL_DOCUMENTS, count=db.query(func.count(DocumentAnalysis.id)).scalar()))
+    db.add_all(CategoryRollup(category=c, count=n) for c, n in categories.items())
+    db.add_all(PersonaRollup(persona=p, count=n) for p, n in personas.items())
+    db.add_all(
+        PersonaCategoryRollup(persona=p, category=c, count=n) for (p, c), n in persona_categories.items()
+    )
+    db.commit()
+
+
+def ensure_rollups(db: Session):
+    """Backfill the rollups once for databases that predate them."""
+    if db.get(AnalyticsTotal, TOTAL_QUERIES) is None:
+        logger.info("Analytics rollups missing — rebuilding from history.")
+        rebuild_rollups(db)
+
+
+def _resolve_names(matched: str, names: list) -> list:
+    """Scheme ids named in a comma-joined list; longest names first so names containing commas match whole."""
+    remaining = f",{matched},"
+    found = []
+    for name, scheme_id in names:
+        token = f",{name},"
+        if token in remaining:
+            found.append(scheme_id)
+            remaining = remaining.replace(token, ",", 1)
+    return found
+
+
+def _increment(db: Session, model, amount: int = 1, **keys):
+    """Atomic `count = count + amount` upsert for the row identified by `keys`."""
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(model).values(**keys, count=amount)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys), set_={"count": model.count + amount}
+        )
+        db.execute(stmt)
+        return
+
+    updated = (
+        db.query(model).filter_by(**keys)
+        .update({model.count: model.count + amount}, synchronize_session=False)
+    )
+    if not updated:
+        db.add(model(**keys, count=amount))
+        db.flush()
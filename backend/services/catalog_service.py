@@ -0,0 +1,281 @@
+"""
+Catalog Service — Idempotent, diff-based loading of the scheme catalog.
+
+Schemes are upserted by a stable natural key (`slug`, derived from the name unless
+given), so IDs never change across reloads. Records are streamed from JSON Lines / CSV
+(plain JSON arrays are read whole) and applied in batches inside one transaction:
+readers keep seeing the previous catalog until the commit. Only schemes missing from
+the source are deleted (leaving a tombstone). Any change creates a new CatalogVersion,
+which caches key on and which stamps the rows it touched.
+
+CLI:  python -m services.catalog_service schemes.jsonl [more.csv ...] [--no-prune]
+"""
+import os
+import re
+import csv
+import sys
+import json
+import base64
+import logging
+import unicodedata
+from itertools import islice
+from typing import Iterable, Iterator, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models import Scheme, CatalogVersion, SchemeTombstone
+
+logger = logging.getLogger(__name__)
+
+CATALOG_BATCH_SIZE = int(os.getenv("CATALOG_BATCH_SIZE", "500"))
+
+# Catalog fields a record may set (anything else in a record is ignored)
+SCHEME_FIELDS = (
+    "name", "category", "description", "eligibility_criteria", "benefits",
+    "application_process", "documents_required", "contact_info",
+    "min_age", "max_age", "max_income", "target_categories", "website",
+)
+# Fields clients may request with `fields=` (id is always included)
+PUBLIC_FIELDS = ("id", "slug") + SCHEME_FIELDS + ("catalog_version",)
+_INT_FIELDS = ("min_age", "max_age")
+_FLOAT_FIELDS = ("max_income",)
+
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+
+class CatalogError(ValueError):
+    """Raised for records that cannot be loaded (e.g. missing name, duplicate slug)."""
+
+
+def slugify(name: str) -> str:
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return _SLUG_RE.sub("-", ascii_name.lower()).strip("-")
+
+
+def current_version(db: Session) -> int:
+    """Latest catalog version (0 before the first load)."""
+    return db.query(func.max(CatalogVersion.id)).scalar() or 0
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """`fields=name,category` → ("id", "name", "category"); all public fields when empty."""
+    if not fields:
+        return PUBLIC_FIELDS
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in PUBLIC_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(PUBLIC_FIELDS)}")
+    return tuple(dict.fromkeys(["id", *requested]))
+
+
+def list_schemes(db: Session, fields: Tuple[str, ...], limit: int, cursor: Optional[str] = None,
+                 category: Optional[str] = None, since_version: Optional[int] = None) -> dict:
+    """
+    One page of the catalog in id order, selecting only `fields`. Keyset-paginated on id;
+    with `since_version`, only schemes added or changed after that version are listed and
+    the first page also carries the ids removed since then.
+    """
+    query = db.query(*(getattr(Scheme, f) for f in fields))
+    if category:
+        query = query.filter(Scheme.category == category)
+    if since_version is not None:
+        query = query.filter(Scheme.catalog_version > since_version)
+    if cursor:
+        query = query.filter(Scheme.id > _decode_cursor(cursor))
+    rows = query.order_by(Scheme.id).limit(limit + 1).all()
+
+    page = {
+        "items": [dict(zip(fields, row)) for row in rows[:limit]],
+        "next_cursor": _encode_cursor(rows[limit - 1][0]) if len(rows) > limit else None,
+        "removed_ids": [],
+    }
+    if since_version is not None and not cursor:
+        page["removed_ids"] = [
+            id_ for (id_,) in db.query(SchemeTombstone.scheme_id)
+            .filter(SchemeTombstone.catalog_version > since_version)
+            .order_by(SchemeTombstone.scheme_id)
+        ]
+    return page
+
+
+def get_scheme(db: Session, scheme_id: int, fields: Tuple[str, ...]) -> Optional[dict]:
+    row = db.query(*(getattr(Scheme, f) for f in fields)).filter(Scheme.id == scheme_id).first()
+    return dict(zip(fields, row)) if row else None
+
+
+def _encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> int:
+    try:
+        return int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except Exception:
+        raise ValueError("Invalid cursor.")
+
+
+def iter_file(path: str) -> Iterator[dict]:
+    """Stream records from a .jsonl/.ndjson or .csv file; .json must hold an array."""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, encoding="utf-8", newline="") as f:
+        if ext in (".jsonl", ".ndjson"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        elif ext == ".csv":
+            yield from csv.DictReader(f)
+        elif ext == ".json":
+            yield from json.load(f)
+        else:
+            raise CatalogError(f"Unsupported catalog file type: {ext}")
+
+
+def load_catalog(db: Session, records: Iterable[dict], source: str = "", prune: bool = True,
+                 batch_size: Optional[int] = None) -> dict:
+    """
+    Upsert `records` by slug and (with `prune`) delete schemes absent from them.
+    Returns counts and the resulting catalog version; the version only moves when
+    something actually changed.
+    """
+    try:
+        return _load(db, records, source, prune, batch_size or CATALOG_BATCH_SIZE)
+    except Exception:
+        db.rollback()   # Nothing is applied unless the whole load succeeds
+        raise
+
+
+def _load(db: Session, records: Iterable[dict], source: str, prune: bool, batch_size: int) -> dict:
+    _backfill_slugs(db)
+
+    version = CatalogVersion(source=source)
+    db.add(version)
+    db.flush()
+
+    seen: set = set()
+    added = updated = unchanged = 0
+    records = iter(records)
+    while batch := [_normalize(r) for r in islice(records, batch_size)]:
+        slugs = [r["slug"] for r in batch]
+        duplicates = seen.intersection(slugs) or {s for s in slugs if slugs.count(s) > 1}
+        if duplicates:
+            raise CatalogError(f"Duplicate scheme slug(s): {', '.join(sorted(duplicates))}")
+        seen.update(slugs)
+
+        existing = {s.slug: s for s in db.query(Scheme).filter(Scheme.slug.in_(slugs))}
+        inserts, changes = [], []
+        for record in batch:
+            scheme = existing.get(record["slug"])
+            if scheme is None:
+                inserts.append({**record, "catalog_version": version.id})
+            elif any(getattr(scheme, k) != v for k, v in record.items()):
+                changes.append({**record, "id": scheme.id, "catalog_version": version.id})
+            else:
+                unchanged += 1
+        if inserts:
+            db.bulk_insert_mappings(Scheme, inserts)
+            db.flush()
+            # A scheme that takes over a removed id (SQLite without AUTOINCREMENT reuses
+            # the highest rowid) must not stay listed in removed_ids
+            new_ids = db.query(Scheme.id).filter(Scheme.slug.in_([r["slug"] for r in inserts]))
+            (
+                db.query(SchemeTombstone).filter(SchemeTombstone.scheme_id.in_(new_ids.scalar_subquery()))
+                .delete(synchronize_session=False)
+            )
+        if changes:
+            db.bulk_update_mappings(Scheme, changes)
+        added += len(inserts)
+        updated += len(changes)
+        db.flush()
+        db.expunge_all()   # Keep memory flat across thousands of schemes
+
+    removed = 0
+    if prune:
+        stale = [(id_, slug) for id_, slug in db.query(Scheme.id, Scheme.slug) if slug not in seen]
+        for start in range(0, len(stale), batch_size):
+            chunk = stale[start:start + batch_size]
+            ids = [id_ for id_, _slug in chunk]
+            # Tombstones let clients syncing with since_version drop removed schemes
+            db.bulk_insert_mappings(SchemeTombstone, [
+                {"scheme_id": id_, "slug": slug, "catalog_version": version.id} for id_, slug in chunk
+            ])
+            # Search-history match rows are kept: they are history, and /top-schemes joins
+            # them to live schemes, so removed ones simply drop out of the ranking
+            removed += db.query(Scheme).filter(Scheme.id.in_(ids)).delete(synchronize_session=False)
+
+    result = {"added": added, "updated": updated, "removed": removed, "unchanged": unchanged}
+    if added or updated or removed:
+        version = db.merge(version)
+        version.added, version.updated, version.removed = added, updated, removed
+        db.commit()
+        result["version"] = version.id
+        logger.info(f"Catalog version {version.id} loaded from {source or 'records'}: {result}")
+    else:
+        db.rollback()
+        result["version"] = current_version(db)
+    return result
+
+
+def _normalize(record: dict) -> dict:
+    name = (record.get("name") or "").strip()
+    if not name:
+        raise CatalogError(f"Scheme record without a name: {record}")
+    clean = {"slug": (record.get("slug") or "").strip() or slugify(name)}
+    for field in SCHEME_FIELDS:
+        value = record.get(field)
+        if isinstance(value, str):
+            value = value.strip()
+            if value == "" and field != "name":
+                value = None
+        if value is not None and field in _INT_FIELDS:
+            value = int(float(value))
+        elif value is not None and field in _FLOAT_FIELDS:
+            value = float(value)
+        clean[field] = value
+    clean["min_age"] = clean["min_age"] if clean["min_age"] is not None else 0
+    clean["max_age"] = clean["max_age"] if clean["max_age"] is not None else 100
+    clean["max_income"] = clean["max_income"] if clean["max_income"] is not None else 0.0
+    clean["target_categories"] = clean["target_categories"] or "All"
+    return clean
+
+
+def _backfill_slugs(db: Session):
+    """
+    Give schemes created before slugs existed their name-derived slug. Raises
+    CatalogError if two schemes would get the same slug (e.g. duplicate names).
+    """
+    legacy = db.query(Scheme).filter(Scheme.slug.is_(None)).all()
+    if not legacy:
+        return
+    owners: dict = {}
+    for id_, slug in db.query(Scheme.id, Scheme.slug).filter(Scheme.slug.isnot(None)):
+        owners[slug] = [id_]
+    for scheme in legacy:
+        scheme.slug = slugify(scheme.name)
+        owners.setdefault(scheme.slug, []).append(scheme.id)
+    clashes = {slug: ids for slug, ids in owners.items() if len(ids) > 1}
+    if clashes:
+        details = "; ".join(
+            f"'{slug}' (scheme ids {', '.join(map(str, ids))})" for slug, ids in sorted(clashes.items())
+        )
+        raise CatalogError(
+            f"Cannot derive unique slugs for existing schemes: {details}. "
+            "Rename or remove the duplicates, or set their slug, before loading the catalog."
+        )
+    db.flush()
+
+
+if __name__ == "__main__":
+    from database import SessionLocal, engine, Base
+
+    logging.basicConfig(level=logging.INFO)
+    args = sys.argv[1:]
+    prune = "--no-prune" not in args
+    paths = [a for a in args if not a.startswith("--")]
+    if not paths:
+        sys.exit("Usage: python -m services.catalog_service FILE [FILE ...] [--no-prune]")
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as session:
+        records = (record for path in paths for record in iter_file(path))
+        print(load_catalog(session, records, source=",".join(paths), prune=prune))
@@ -0,0 +1,186 @@
+"""
+Document Jobs — Background document analysis on a bounded worker pool.
+Job state lives in the document_jobs table, so status and results can be read
+from any request (or app worker) while the analysis runs. The queue itself is held
+in memory by the web process, which refreshes `updated_at` on the jobs it holds every
+DOCUMENT_JOB_HEARTBEAT_SECONDS. Unfinished jobs no process has refreshed for
+DOCUMENT_JOB_STALE_SECONDS (their process crashed or restarted) are failed — at
+startup and on every heartbeat — while sibling workers' live jobs are left alone.
+"""
+import os
+import time
+import uuid
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from database import SessionLocal
+from models import DocumentJob
+from schemas import DocumentJobStatus
+from services import document_service
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("DOCUMENT_JOB_WORKERS", "2"))
+JOB_QUEUE_SIZE = int(os.getenv("DOCUMENT_JOB_QUEUE_SIZE", "50"))
+JOB_EVENTS_MAX_SECONDS = float(os.getenv("DOCUMENT_JOB_EVENTS_MAX_SECONDS", "900"))
+JOB_HEARTBEAT_SECONDS = float(os.getenv("DOCUMENT_JOB_HEARTBEAT_SECONDS", "30"))
+JOB_STALE_SECONDS = float(os.getenv("DOCUMENT_JOB_STALE_SECONDS", "120"))   # > heartbeat
+
+FINISHED_STATUSES = ("done", "failed")
+INTERRUPTED_ERROR = "The analysis was interrupted by a server restart. Please upload the document again."
+
+_PROGRESS_INTERVAL = 0.5   # seconds between progress writes (the events stream polls at this rate)
+
+_queue: Optional[asyncio.Queue] = None
+_loop = None
+_workers: list = []
+_heartbeat: Optional[asyncio.Task] = None
+_active: set = set()       # Ids of the jobs queued or running in this process
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when the job queue is at JOB_QUEUE_SIZE."""
+
+
+def submit(db, upload, content_hash: str, filename: Optional[str], file_ext: str) -> DocumentJob:
+    """
+    Queue a spooled upload for analysis and return the new job row.
+    The job takes ownership of `upload` and closes it when finished.
+    """
+    queue = _ensure_workers()
+    if queue.full():
+        raise JobQueueFullError("Too many documents are being analyzed. Please try again shortly.")
+
+    job = DocumentJob(id=str(uuid.uuid4()), filename=filename, status="queued")
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    _active.add(job.id)
+    queue.put_nowait((job.id, upload, content_hash, filename, file_ext))
+    return job
+
+
+def fail_interrupted_jobs(db) -> int:
+    """
+    Mark queued/running jobs whose process stopped refreshing them as failed (their
+    uploads are gone). Jobs held by this or any other live process are not touched.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=JOB_STALE_SECONDS)
+    failed = (
+        db.query(DocumentJob)
+        .filter(
+            DocumentJob.status.notin_(FINISHED_STATUSES),
+            DocumentJob.updated_at < cutoff,
+            DocumentJob.id.notin_(list(_active)),
+        )
+        .update(
+            {"status": "failed", "error": INTERRUPTED_ERROR, "updated_at": datetime.utcnow()},
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    if failed:
+        logger.warning(f"Marked {failed} interrupted document job(s) as failed.")
+    return failed
+
+
+def to_status(job: DocumentJob) -> DocumentJobStatus:
+    return DocumentJobStatus(
+        job_id=job.id,
+        filename=job.filename,
+        status=job.status,
+        pages_done=job.pages_done or 0,
+        pages_total=job.pages_total or 0,
+        chunks_done=job.chunks_done or 0,
+        chunks_total=job.chunks_total or 0,
+        error=job.error,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+    )
+
+
+def _ensure_workers() -> asyncio.Queue:
+    """Lazily start the worker and heartbeat tasks on the running event loop."""
+    global _queue, _loop, _workers, _heartbeat
+    loop = asyncio.get_running_loop()
+    if _queue is None or _loop is not loop:
+        _loop = loop
+        _queue = asyncio.Queue(maxsize=JOB_QUEUE_SIZE)
+        _workers = [loop.create_task(_worker(_queue)) for _ in range(max(JOB_WORKERS, 1))]
+        _heartbeat = loop.create_task(_run_heartbeat())
+    return _queue
+
+
+async def _run_heartbeat():
+    while True:
+        await asyncio.sleep(JOB_HEARTBEAT_SECONDS)
+        try:
+            await asyncio.to_thread(_beat)
+        except Exception as e:
+            logger.error(f"Document job heartbeat failed: {e}")
+
+
+def _beat():
+    """Refresh this process's unfinished jobs, then fail jobs no process is refreshing."""
+    with SessionLocal() as db:
+        active = list(_active)
+        if active:
+            (
+                db.query(DocumentJob)
+                .filter(DocumentJob.id.in_(active), DocumentJob.status.notin_(FINISHED_STATUSES))
+                .update({"updated_at": datetime.utcnow()}, synchronize_session=False)
+            )
+            db.commit()
+        fail_interrupted_jobs(db)
+
+
+async def _worker(queue: asyncio.Queue):
+    while True:
+        job_id, upload, content_hash, filename, file_ext = await queue.get()
+        db = SessionLocal()
+        try:
+            _update(db, job_id, status="running")
+            progress, pending = _throttled_progress(db, job_id)
+            result = await document_service.analyze_upload(
+                db, upload, content_hash, filename, file_ext, progress=progress
+            )
+            _update(db, job_id, status="done", result=result.model_dump_json(), **pending)
+        except Exception as e:
+            logger.error(f"Document job {job_id} failed: {e}")
+            db.rollback()
+            _update(db, job_id, status="failed", error="Document analysis failed.")
+        finally:
+            _active.discard(job_id)
+            upload.close()
+            db.close()
+            queue.task_done()
+
+
+def _throttled_progress(db, job_id: str):
+    """
+    Progress callback that writes at most every _PROGRESS_INTERVAL seconds, plus at the
+    end of each stage, instead of committing on the event loop for every page or chunk.
+    Returns (callback, pending fields not yet written).
+    """
+    pending: dict = {}
+    last_write = 0.0
+
+    def progress(stage: str, done: int, total: int):
+        nonlocal last_write
+        pending.update({f"{stage}_done": done, f"{stage}_total": total})
+        now = time.monotonic()
+        if done >= total or now - last_write >= _PROGRESS_INTERVAL:
+            _update(db, job_id, **pending)
+            pending.clear()
+            last_write = now
+
+    return progress, pending
+
+
+def _update(db, job_id: str, **fields):
+    fields["updated_at"] = datetime.utcnow()
+    db.query(DocumentJob).filter(DocumentJob.id == job_id).update(fields, synchronize_session=False)
+    db.commit()
@@ -0,0 +1,477 @@
+"""
+Document Service — Upload buffering and text extraction off the event loop.
+Uploads are held in a size-bounded spooled buffer (memory first, disk only for
+large files) and PDF parsing runs on a bounded set of worker processes with a per-file
+timeout. Each worker runs one task at a time, so a runaway parse is stopped by killing
+only its own worker.
+"""
+import os
+import asyncio
+import logging
+import hashlib
+import zipfile
+import tempfile
+from typing import AsyncIterator, Callable, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from models import DocumentAnalysis
+from database import SessionLocal
+from schemas import AnalysisResponse, BatchAnalysisItem
+from services import ai_service, analytics_service
+
+logger = logging.getLogger(__name__)
+
+# Limits (configurable via environment)
+MAX_UPLOAD_BYTES = int(os.getenv("DOCUMENT_MAX_UPLOAD_MB", "20")) * 1024 * 1024
+SPOOL_MEMORY_BYTES = int(os.getenv("DOCUMENT_SPOOL_MEMORY_MB", "4")) * 1024 * 1024
+EXTRACT_WORKERS = int(os.getenv("DOCUMENT_EXTRACT_WORKERS", "2"))
+EXTRACT_TIMEOUT_SECONDS = float(os.getenv("DOCUMENT_EXTRACT_TIMEOUT", "60"))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "200"))            # 0 = no limit
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "10"))
+BATCH_MAX_UPLOAD_BYTES = int(os.getenv("BATCH_MAX_UPLOAD_MB", "100")) * 1024 * 1024
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "50"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "3"))
+
+SUPPORTED_EXTENSIONS = (".txt", ".pdf")
+
+_READ_CHUNK = 64 * 1024
+
+_TIMEOUT_MESSAGE = "Could not extract text from this PDF in time. The file may be too large or scanned."
+_CRASH_MESSAGE = "Could not extract text from this PDF. The file may be scanned or encrypted."
+_NO_PYPDF_MESSAGE = "PDF text extraction requires PyPDF2. Install it with: pip install PyPDF2"
+_EMPTY_MESSAGE = "The document appears to be empty or could not be read."
+
+# Placeholder text yielded in place of document content; analyses built on it are not reused
+_EXTRACTION_FAILURES = (_TIMEOUT_MESSAGE, _CRASH_MESSAGE, _NO_PYPDF_MESSAGE)
+
+# progress(stage, done, total) — stage is "pages" or "chunks"
+ProgressCallback = Callable[[str, int, int], None]
+
+# Idle single-process executors; at most EXTRACT_WORKERS exist (busy + idle)
+_workers: list = []
+_worker_slots: Optional[asyncio.Semaphore] = None
+_slots_loop = None
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds MAX_UPLOAD_BYTES while streaming."""
+
+
+class _TextSeenBefore(Exception):
+    """Stops an in-flight analysis whose extracted text matches a stored one."""
+
+    def __init__(self, analysis: DocumentAnalysis):
+        super().__init__(analysis.id)
+        self.analysis = analysis
+
+
+def _get_worker_slots() -> asyncio.Semaphore:
+    """Lazily create the worker-slot semaphore on the running event loop."""
+    global _worker_slots, _slots_loop
+    loop = asyncio.get_running_loop()
+    if _worker_slots is None or _slots_loop is not loop:
+        _slots_loop = loop
+        _worker_slots = asyncio.Semaphore(max(EXTRACT_WORKERS, 1))
+    return _worker_slots
+
+
+async def spool_upload(file, max_bytes: int | None = None) -> Tuple[tempfile.SpooledTemporaryFile, str]:
+    """
+    Stream an UploadFile into a SpooledTemporaryFile, enforcing the size cap and hashing
+    (SHA-256) as bytes arrive. Small files never touch the disk.
+    Returns (buffer, hex digest); the caller owns (and must close) the buffer.
+    """
+    max_bytes = max_bytes or MAX_UPLOAD_BYTES
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while True:
+            chunk = await file.read(_READ_CHUNK)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLargeError(
+                    f"File is larger than the {max_bytes // (1024 * 1024)} MB limit."
+                )
+            digest.update(chunk)
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool, digest.hexdigest()
+
+
+def text_fingerprint(text: str) -> str:
+    """SHA-256 of whitespace-normalized, lower-cased text — matches re-saved copies of a document."""
+    fingerprint = _TextFingerprint()
+    fingerprint.update(text)
+    return fingerprint.hexdigest()
+
+
+class _TextFingerprint:
+    """text_fingerprint() computed incrementally over text that arrives in parts."""
+
+    def __init__(self):
+        self._digest = hashlib.sha256()
+        self.empty = True
+
+    def update(self, part: str):
+        words = part.split()
+        if words:
+            self._digest.update(("" if self.empty else " ").encode() + " ".join(words).lower().encode("utf-8"))
+            self.empty = False
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
+
+async def analyze_upload(
+    db,
+    upload,
+    content_hash: str,
+    filename: Optional[str],
+    file_ext: str,
+    progress: Optional[ProgressCallback] = None,
+) -> AnalysisResponse:
+    """
+    Full analysis pipeline for a spooled upload: reuse a stored analysis when the bytes or
+    normalized text were seen before, otherwise extract, simplify and store the result.
+    Degraded results (failed extraction or LLM fallbacks) are stored without hashes so
+    they are never reused.
+    """
+    # Same bytes analyzed before with the current prompts/model → reuse
+    version = ai_service.analysis_version()
+    cached = find_cached_analysis(db, version, content_sha256=content_hash)
+    if cached:
+        return _cached_response(filename, cached)
+
+    # Extract text (PDF page ranges run on the extraction worker processes) and stream it
+    # into chunk simplification as it arrives, hashing the normalized text on the way
+    parts: list = []
+    fingerprint = _TextFingerprint()
+
+    async def extracted() -> AsyncIterator[str]:
+        async for part in iter_text(upload, file_ext, progress):
+            parts.append(part)
+            fingerprint.update(part)
+            yield part
+        # Different file, same text (e.g. a re-saved copy of the same circular) — checked
+        # as soon as extraction ends, before the remaining chunks are scheduled
+        if not fingerprint.empty and not _extraction_failed(parts):
+            cached = find_cached_analysis(db, version, text_sha256=fingerprint.hexdigest())
+            if cached:
+                raise _TextSeenBefore(cached)
+
+    # Simplify long documents chunk by chunk, then produce the simplification and
+    # next steps together (one fused call for short documents)
+    try:
+        content, partials = await ai_service.map_document(extracted(), progress)
+    except _TextSeenBefore as seen:
+        return _cached_response(filename, seen.analysis)
+    degraded = _extraction_failed(parts)
+    if not content:
+        content = _EMPTY_MESSAGE
+        degraded = True
+    text_hash = fingerprint.hexdigest()
+
+    analysis_result = await ai_service.analyze_document_text(content, partials)
+    simplification = analysis_result["simplification"]
+    next_steps = analysis_result["next_steps"]
+    degraded = degraded or analysis_result["degraded"]
+
+    # Store in database
+    summary = content[:300] + "..." if len(content) > 300 else content
+    analysis = DocumentAnalysis(
+        filename=filename,
+        content_summary=summary,
+        simplification=simplification,
+        next_steps=next_steps,
+        content_sha256=None if degraded else content_hash,
+        text_sha256=None if degraded else text_hash,
+        analysis_version=version,
+    )
+    db.add(analysis)
+    analytics_service.record_document(db)
+    db.commit()
+
+    return AnalysisResponse(
+        filename=filename or "unknown",
+        summary=summary,
+        simplification=simplification,
+        next_steps=next_steps
+    )
+
+
+def _extraction_failed(parts: list) -> bool:
+    return any(part in _EXTRACTION_FAILURES for part in parts)
+
+
+def archive_members(archive: zipfile.ZipFile) -> list:
+    """Supported (TXT/PDF) files in a zip archive, skipping directories and OS metadata."""
+    return [
+        info for info in archive.infolist()
+        if not info.is_dir()
+        and not info.filename.startswith("__MACOSX/")
+        and not os.path.basename(info.filename).startswith(".")
+        and os.path.splitext(info.filename)[1].lower() in SUPPORTED_EXTENSIONS
+    ]
+
+
+async def iter_archive_analyses(archive: zipfile.ZipFile, members: list) -> AsyncIterator[BatchAnalysisItem]:
+    """
+    Analyze archive members with at most BATCH_CONCURRENCY in flight and yield each result
+    as it completes. Members are decompressed one at a time (they share the archive's file
+    handle) into spooled buffers like any upload — in memory up to DOCUMENT_SPOOL_MEMORY_MB,
+    a temporary file beyond that — and their PDF pages go through the shared extraction workers.
+    """
+    slots = asyncio.Semaphore(max(BATCH_CONCURRENCY, 1))
+    read_lock = asyncio.Lock()
+    results: asyncio.Queue = asyncio.Queue()
+
+    async def analyze_member(index: int, info: zipfile.ZipInfo):
+        filename = os.path.basename(info.filename)
+        db = SessionLocal()
+        try:
+            async with read_lock:
+                upload, content_hash = await asyncio.to_thread(_spool_member, archive, info)
+            try:
+                result = await analyze_upload(
+                    db, upload, content_hash, filename, os.path.splitext(filename)[1].lower()
+                )
+            finally:
+                upload.close()
+            await results.put(BatchAnalysisItem(index=index, filename=filename, result=result))
+        except UploadTooLargeError as e:
+            await results.put(BatchAnalysisItem(index=index, filename=filename, error=str(e)))
+        except Exception as e:
+            logger.error(f"Batch analysis error ({info.filename}): {e}")
+            db.rollback()
+            await results.put(BatchAnalysisItem(index=index, filename=filename, error="Document analysis failed."))
+        finally:
+            db.close()
+            slots.release()
+
+    async def schedule():
+        for index, info in enumerate(members):
+            await slots.acquire()
+            tasks.append(asyncio.create_task(analyze_member(index, info)))
+
+    tasks: list = []
+    scheduler = asyncio.create_task(schedule())
+    try:
+        for _ in members:
+            yield await results.get()
+    finally:
+        scheduler.cancel()
+        for task in tasks:
+            task.cancel()
+
+
+def _spool_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo) -> Tuple[tempfile.SpooledTemporaryFile, str]:
+    """Decompress one archive member into a spooled buffer, enforcing MAX_UPLOAD_BYTES (zip-bomb guard)."""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with archive.open(info) as member:
+            while chunk := member.read(_READ_CHUNK):
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise UploadTooLargeError(
+                        f"File is larger than the {MAX_UPLOAD_BYTES // (1024 * 1024)} MB limit."
+                    )
+                digest.update(chunk)
+                spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool, digest.hexdigest()
+
+
+def find_cached_analysis(db, version: Optional[str], **hashes) -> Optional[DocumentAnalysis]:
+    """Latest stored analysis matching a content/text hash and the current analysis version."""
+    if not version:
+        return None
+    column, value = next(iter(hashes.items()))
+    return (
+        db.query(DocumentAnalysis)
+        .filter(
+            getattr(DocumentAnalysis, column) == value,
+            DocumentAnalysis.analysis_version == version,
+            DocumentAnalysis.next_steps.isnot(None),
+        )
+        .order_by(DocumentAnalysis.id.desc())
+        .first()
+    )
+
+
+def _cached_response(filename: Optional[str], analysis: DocumentAnalysis) -> AnalysisResponse:
+    return AnalysisResponse(
+        filename=filename or "unknown",
+        summary=analysis.content_summary or "",
+        simplification=analysis.simplification or "",
+        next_steps=analysis.next_steps,
+    )
+
+
+async def extract_text(spool, file_ext: str) -> str:
+    """Extract the full text from a spooled TXT or PDF upload without blocking the event loop."""
+    parts = [part async for part in iter_text(spool, file_ext)]
+    return "\n".join(p for p in parts if p).strip()
+
+
+async def iter_text(spool, file_ext: str, progress: Optional[ProgressCallback] = None) -> AsyncIterator[str]:
+    """
+    Yield document text in reading order as it becomes available.
+    PDFs are split into page ranges extracted in parallel across the worker processes;
+    each range is yielded as soon as it and all earlier ranges are done.
+    """
+    spool.seek(0)
+    data = spool.read()
+
+    if file_ext == ".txt":
+        yield data.decode("utf-8", errors="ignore")
+        if progress:
+            progress("pages", 1, 1)
+    elif file_ext == ".pdf":
+        async for part in _iter_pdf_text(data, progress):
+            yield part
+
+
+async def _iter_pdf_text(data: bytes, progress: Optional[ProgressCallback] = None) -> AsyncIterator[str]:
+    """
+    Extract PDF page ranges concurrently and yield them in order within one per-file deadline.
+    Extraction stops at the first range that times out or crashes its worker.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + EXTRACT_TIMEOUT_SECONDS
+
+    split = await _run_in_worker(deadline, _split_pdf, data, PDF_MAX_PAGES, max(PDF_PAGES_PER_TASK, 1))
+    if isinstance(split, str):
+        yield split  # Error message
+        return
+
+    page_count, ranges = split
+    total = sum(pages for pages, _range_pdf in ranges)
+    if total < page_count:
+        logger.info(f"PDF has {page_count} pages — extracting the first {total} (PDF_MAX_PAGES).")
+
+    tasks = [
+        asyncio.create_task(_run_in_worker(deadline, _extract_pdf_range, range_pdf))
+        for _pages, range_pdf in ranges
+    ]
+    done = 0
+    try:
+        for (pages, _range_pdf), task in zip(ranges, tasks):
+            text = await task
+            yield text
+            if text in (_TIMEOUT_MESSAGE, _CRASH_MESSAGE):
+                break
+            done += pages
+            if progress:
+                progress("pages", done, total)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _run_in_worker(deadline: float, func, *args):
+    """
+    Run an extraction function on an idle worker process, bounded by the file's deadline.
+    A worker whose task times out, crashes or is abandoned is killed and replaced; the
+    other workers (and the uploads using them) are not affected.
+    """
+    loop = asyncio.get_running_loop()
+    slots = _get_worker_slots()
+    try:
+        await asyncio.wait_for(slots.acquire(), timeout=max(deadline - loop.time(), 0))
+    except asyncio.TimeoutError:
+        logger.error(f"No extraction worker became free within {EXTRACT_TIMEOUT_SECONDS}s.")
+        return _TIMEOUT_MESSAGE
+
+    worker = _workers.pop() if _workers else ProcessPoolExecutor(max_workers=1)
+    reusable = False
+    try:
+        future = loop.run_in_executor(worker, func, *args)
+        try:
+            result = await asyncio.wait_for(future, timeout=max(deadline - loop.time(), 0))
+        except asyncio.TimeoutError:
+            # wait_for only abandons the await — the worker would keep parsing, so kill it
+            logger.error(f"Text extraction timed out after {EXTRACT_TIMEOUT_SECONDS}s — restarting its worker.")
+            return _TIMEOUT_MESSAGE
+        except BrokenProcessPool:
+            logger.error("Extraction worker crashed — restarting it.")
+            return _CRASH_MESSAGE
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                raise  # This upload was cancelled; its worker is killed below
+            logger.error("Extraction task was cancelled — restarting its worker.")
+            return _CRASH_MESSAGE
+        reusable = True
+        return result
+    finally:
+        if reusable:
+            _workers.append(worker)
+        else:
+            _kill_worker(worker)
+        slots.release()
+
+
+def _kill_worker(worker: ProcessPoolExecutor) -> None:
+    """Shut down a single-process executor and terminate its process if still running."""
+    processes = list((getattr(worker, "_processes", None) or {}).values())
+    worker.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+
+
+def _split_pdf(data: bytes, max_pages: int, step: int):
+    """
+    Parse a PDF once and cut the pages to extract (capped at `max_pages`, 0 = no limit)
+    into standalone PDFs of `step` pages, so each range task ships and parses only its
+    own pages. Returns (page_count, [(pages, range_pdf), ...]) or an error message.
+    Runs inside a worker process.
+    """
+    try:
+        from io import BytesIO
+        from PyPDF2 import PdfReader, PdfWriter
+        reader = PdfReader(BytesIO(data))
+        page_count = len(reader.pages)
+        total = min(page_count, max_pages) if max_pages > 0 else page_count
+        ranges = []
+        for start in range(0, total, step):
+            writer = PdfWriter()
+            for page in reader.pages[start:min(start + step, total)]:
+                writer.add_page(page)
+            buffer = BytesIO()
+            writer.write(buffer)
+            ranges.append((len(writer.pages), buffer.getvalue()))
+        return page_count, ranges
+    except ImportError:
+        logger.warning("PyPDF2 not installed — returning placeholder for PDF.")
+        return _NO_PYPDF_MESSAGE
+    except Exception as e:
+        logger.error(f"PDF extraction error: {e}")
+        return _CRASH_MESSAGE
+
+
+def _extract_pdf_range(range_pdf: bytes) -> str:
+    """Extract the text of a page-range PDF cut by _split_pdf. Runs inside a worker process."""
+    try:
+        from io import BytesIO
+        from PyPDF2 import PdfReader
+        text = ""
+        for page in PdfReader(BytesIO(range_pdf)).pages:
+            page_text = page.extract_text()
+            if page_text:
+                text += page_text + "\n"
+        return text.strip()
+    except Exception as e:
+        logger.error(f"PDF extraction error: {e}")
+        return ""
@@ -1,10 +1,18 @@
 """
 Eligibility Engine — Rule-based logic for scheme matching.
 """
-from typing import List
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 from models import Scheme
 from schemas import EligibilityCriteria
 
+# Criteria checked by the engine, in evaluation order
+CRITERIA = ("age", "income", "category")
+
+# Per-profile evaluations, keyed by (profile, catalog version) — see evaluate_profile()
+_EVAL_CACHE: "OrderedDict[tuple, Dict[int, List[str]]]" = OrderedDict()
+_EVAL_CACHE_SIZE = 256
+
 
 def get_eligible_schemes(profile: EligibilityCriteria, all_schemes: List[Scheme]) -> List[Scheme]:
     """
@@ -25,6 +33,97 @@ def get_eligible_schemes(profile: EligibilityCriteria, all_schemes: List[Scheme]
     return eligible
 
 
+def failed_criteria(profile: EligibilityCriteria, scheme: Scheme, only: Optional[Tuple[str, ...]] = None) -> List[str]:
+    """Return the criteria (from CRITERIA) the profile fails for a scheme, optionally limited to `only`."""
+    checks = {
+        "age": lambda: _check_age(profile.age, scheme),
+        "income": lambda: _check_income(profile.income, scheme),
+        "category": lambda: _check_category(profile.category, scheme),
+    }
+    return [name for name in (only or CRITERIA) if not checks[name]()]
+
+
+def evaluate_profile(profile: EligibilityCriteria, all_schemes: List[Scheme],
+                     catalog_version: Optional[int] = None) -> Dict[int, List[str]]:
+    """
+    Evaluate every scheme for a profile → {scheme_id: [failed criteria]}.
+    An empty list means eligible. Results are cached per profile and catalog version
+    (or a hash of the rule fields when no version is given), so repeated what-if
+    explorations from the same base profile skip the full scan.
+    """
+    catalog_key = ("version", catalog_version) if catalog_version else _rules_key(all_schemes)
+    key = (_profile_key(profile), catalog_key)
+    cached = _EVAL_CACHE.get(key)
+    if cached is not None:
+        _EVAL_CACHE.move_to_end(key)
+        return cached
+
+    evaluation = {s.id: failed_criteria(profile, s) for s in all_schemes}
+    _EVAL_CACHE[key] = evaluation
+    if len(_EVAL_CACHE) > _EVAL_CACHE_SIZE:
+        _EVAL_CACHE.popitem(last=False)
+    return evaluation
+
+
+def evaluate_variant(
+    base: EligibilityCriteria,
+    base_eval: Dict[int, List[str]],
+    variant: EligibilityCriteria,
+    all_schemes: List[Scheme],
+) -> Dict[int, List[str]]:
+    """
+    Derive a variant's evaluation from the base evaluation.
+    Only the criteria whose input field changed are re-checked; the rest are reused.
+    """
+    changed = tuple(
+        name for name in CRITERIA
+        if _normalized(getattr(base, name)) != _normalized(getattr(variant, name))
+    )
+    if not changed:
+        return base_eval
+
+    evaluation = {}
+    for scheme in all_schemes:
+        kept = [c for c in base_eval.get(scheme.id, []) if c not in changed]
+        rechecked = failed_criteria(variant, scheme, only=changed)
+        evaluation[scheme.id] = [c for c in CRITERIA if c in kept or c in rechecked]
+    return evaluation
+
+
+def apply_delta(profile: EligibilityCriteria, income_change: float = 0, age_change: int = 0,
+                category: Optional[str] = None) -> EligibilityCriteria:
+    """Return a copy of the profile with the delta applied (age clamped to 1–120, income to ≥ 0)."""
+    return profile.model_copy(update={
+        "age": min(max(profile.age + age_change, 1), 120),
+        "income": max(profile.income + income_change, 0),
+        "category": category.strip() if category and category.strip() else profile.category,
+    })
+
+
+def describe_requirement(criterion: str, scheme: Scheme) -> str:
+    """Human-readable requirement for a criterion, used to explain near-misses."""
+    if criterion == "age":
+        return f"Age between {scheme.min_age or 0} and {scheme.max_age or 100}"
+    if criterion == "income":
+        return f"Annual income up to ₹{scheme.max_income:,.0f}"
+    return f"Category one of: {scheme.target_categories}"
+
+
+def _profile_key(profile: EligibilityCriteria) -> tuple:
+    return tuple(_normalized(getattr(profile, name)) for name in CRITERIA)
+
+
+def _rules_key(all_schemes: List[Scheme]) -> int:
+    """Hash of the rule fields of the catalog, so edits or reseeds invalidate cached evaluations."""
+    return hash(tuple(
+        (s.id, s.min_age, s.max_age, s.max_income, s.target_categories) for s in all_schemes
+    ))
+
+
+def _normalized(value):
+    return value.strip().upper() if isinstance(value, str) else value
+
+
 def _check_age(age: int, scheme: Scheme) -> bool:
     """Check if user's age falls within scheme range."""
     min_age = scheme.min_age or 0
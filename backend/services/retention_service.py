@@ -0,0 +1,183 @@
+"""
+Retention Service — Compaction and archiving of interaction logs.
+
+Two incremental steps, each in small batches with a commit per batch:
+  1. compress — responses older than RETENTION_COMPRESS_DAYS move from `response`
+     into a zlib blob in `response_compressed`
+  2. archive  — interactions and search history older than RETENTION_ARCHIVE_DAYS move
+     to the *_archive tables; their scheme matches are folded into per-scheme counts
+
+Analytics rollups are counters maintained on write, so they are unaffected; volume
+curves, /top-schemes and the /history listing and export also read the archive.
+"""
+import os
+import time
+import zlib
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import (
+    Interaction, InteractionArchive, SearchHistory, SearchHistoryArchive, SearchHistoryMatch,
+)
+from services import analytics_service
+
+logger = logging.getLogger(__name__)
+
+RETENTION_ENABLED = os.getenv("RETENTION_ENABLED", "true").lower() in ("1", "true", "yes")
+RETENTION_COMPRESS_DAYS = int(os.getenv("RETENTION_COMPRESS_DAYS", "30"))
+RETENTION_ARCHIVE_DAYS = int(os.getenv("RETENTION_ARCHIVE_DAYS", "180"))
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "500"))
+RETENTION_INTERVAL_SECONDS = int(os.getenv("RETENTION_INTERVAL_SECONDS", "3600"))
+RETENTION_BATCH_PAUSE_SECONDS = float(os.getenv("RETENTION_BATCH_PAUSE_SECONDS", "0.5"))
+
+COMPRESS_LEVEL = 6
+
+_task = None
+
+
+def compress_text(text: Optional[str]) -> Optional[bytes]:
+    return None if text is None else zlib.compress(text.encode("utf-8"), COMPRESS_LEVEL)
+
+
+def decompress_text(blob: Optional[bytes]) -> Optional[str]:
+    return None if blob is None else zlib.decompress(blob).decode("utf-8")
+
+
+def response_text(interaction) -> Optional[str]:
+    """The interaction's answer, whether it is still plain text or already compacted."""
+    if interaction.response is not None:
+        return interaction.response
+    return decompress_text(interaction.response_compressed)
+
+
+def compress_batch(db: Session, cutoff: datetime, batch_size: int = RETENTION_BATCH_SIZE) -> int:
+    rows = (
+        db.query(Interaction)
+        .filter(Interaction.timestamp < cutoff, Interaction.response.isnot(None))
+        .order_by(Interaction.timestamp)
+        .limit(batch_size)
+        .all()
+    )
+    for row in rows:
+        row.response_compressed = compress_text(row.response)
+        row.response = None
+    db.commit()
+    return len(rows)
+
+
+def archive_interactions_batch(db: Session, cutoff: datetime, batch_size: int = RETENTION_BATCH_SIZE) -> int:
+    rows = (
+        db.query(Interaction)
+        .filter(Interaction.timestamp < cutoff)
+        .order_by(Interaction.timestamp)
+        .limit(batch_size)
+        .all()
+    )
+    if not rows:
+        return 0
+    db.bulk_insert_mappings(InteractionArchive, [
+        {
+            "id": row.id,
+            "user_id": row.user_id,
+            "query": row.query,
+            "response_compressed": row.response_compressed or compress_text(row.response),
+            "persona": row.persona,
+            "timestamp": row.timestamp,
+        }
+        for row in rows
+    ])
+    db.query(Interaction).filter(Interaction.id.in_([row.id for row in rows])).delete(synchronize_session=False)
+    db.commit()
+    return len(rows)
+
+
+def archive_search_history_batch(db: Session, cutoff: datetime, batch_size: int = RETENTION_BATCH_SIZE) -> int:
+    rows = (
+        db.query(SearchHistory)
+        .filter(SearchHistory.timestamp < cutoff)
+        .order_by(SearchHistory.timestamp, SearchHistory.id)
+        .limit(batch_size)
+        .all()
+    )
+    if not rows:
+        return 0
+    ids = [row.id for row in rows]
+    db.bulk_insert_mappings(SearchHistoryArchive, [
+        {
+            "id": row.id,
+            "query_text": row.query_text,
+            "category": row.category,
+            "persona": row.persona,
+            "matched_schemes": row.matched_schemes,
+            "timestamp": row.timestamp,
+        }
+        for row in rows
+    ])
+    match_counts = dict(
+        db.query(SearchHistoryMatch.scheme_id, func.count())
+        .filter(
+            SearchHistoryMatch.search_id.in_(ids),
+            SearchHistoryMatch.scheme_id != analytics_service.UNRESOLVED_SCHEME_ID,
+        )
+        .group_by(SearchHistoryMatch.scheme_id)
+        .all()
+    )
+    analytics_service.record_archived_matches(db, match_counts)
+    db.query(SearchHistoryMatch).filter(SearchHistoryMatch.search_id.in_(ids)).delete(synchronize_session=False)
+    db.query(SearchHistory).filter(SearchHistory.id.in_(ids)).delete(synchronize_session=False)
+    db.commit()
+    return len(rows)
+
+
+def run_batch(now: Optional[datetime] = None) -> dict:
+    """One batch of each step; returns the number of rows each step handled."""
+    now = now or datetime.utcnow()
+    compress_cutoff = now - timedelta(days=RETENTION_COMPRESS_DAYS)
+    archive_cutoff = now - timedelta(days=RETENTION_ARCHIVE_DAYS)
+    with SessionLocal() as db:
+        try:
+            return {
+                "archived_interactions": archive_interactions_batch(db, archive_cutoff),
+                "archived_search_history": archive_search_history_batch(db, archive_cutoff),
+                "compressed_responses": compress_batch(db, compress_cutoff),
+            }
+        except Exception:
+            db.rollback()
+            raise
+
+
+def run_until_done(now: Optional[datetime] = None, pause: float = 0) -> dict:
+    """Run batches until nothing is left to compact or archive."""
+    totals = {"archived_interactions": 0, "archived_search_history": 0, "compressed_responses": 0}
+    while True:
+        done = run_batch(now)
+        for key, count in done.items():
+            totals[key] += count
+        if not any(done.values()):
+            return totals
+        if pause:
+            time.sleep(pause)
+
+
+def start():
+    """Start the periodic retention job on the running event loop (no-op if disabled)."""
+    global _task
+    if RETENTION_ENABLED and (_task is None or _task.done()):
+        _task = asyncio.get_running_loop().create_task(_run_periodically())
+
+
+async def _run_periodically():
+    while True:
+        try:
+            totals = await asyncio.to_thread(run_until_done, None, RETENTION_BATCH_PAUSE_SECONDS)
+            if any(totals.values()):
+                logger.info(f"Retention pass: {totals}")
+        except Exception as e:
+            logger.error(f"Retention pass failed: {e}")
+        await asyncio.sleep(RETENTION_INTERVAL_SECONDS)
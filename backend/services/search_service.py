@@ -0,0 +1,168 @@
+"""
+Search Service — Full-text scheme search.
+
+SQLite: an external-content FTS5 table (schemes_fts) kept in sync with `schemes` by
+triggers, ranked with bm25. Postgres: a stored, generated tsvector column with a GIN
+index, ranked with ts_rank_cd. Other databases fall back to LIKE matching.
+Name matches weigh more than description, benefits and eligibility text.
+Snippets are HTML-escaped catalog text with the matched terms wrapped in <b>…</b>.
+"""
+import re
+import html
+import logging
+from typing import List, Optional
+
+from sqlalchemy import inspect, or_, text
+from sqlalchemy.orm import Session
+
+from models import Scheme
+
+logger = logging.getLogger(__name__)
+
+SNIPPET_START, SNIPPET_END = "<b>", "</b>"
+# The database marks matches with control characters, replaced after HTML-escaping the text
+_MARK_START, _MARK_END = "\x02", "\x03"
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_MAX_TOKENS = 8
+
+_SQLITE_SETUP = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS schemes_fts USING fts5(
+        name, description, benefits, eligibility_criteria,
+        content='schemes', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS schemes_fts_ai AFTER INSERT ON schemes BEGIN
+        INSERT INTO schemes_fts(rowid, name, description, benefits, eligibility_criteria)
+        VALUES (new.id, new.name, new.description, new.benefits, new.eligibility_criteria);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS schemes_fts_ad AFTER DELETE ON schemes BEGIN
+        INSERT INTO schemes_fts(schemes_fts, rowid, name, description, benefits, eligibility_criteria)
+        VALUES ('delete', old.id, old.name, old.description, old.benefits, old.eligibility_criteria);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS schemes_fts_au AFTER UPDATE ON schemes BEGIN
+        INSERT INTO schemes_fts(schemes_fts, rowid, name, description, benefits, eligibility_criteria)
+        VALUES ('delete', old.id, old.name, old.description, old.benefits, old.eligibility_criteria);
+        INSERT INTO schemes_fts(rowid, name, description, benefits, eligibility_criteria)
+        VALUES (new.id, new.name, new.description, new.benefits, new.eligibility_criteria);
+    END""",
+]
+
+_POSTGRES_SETUP = [
+    """ALTER TABLE schemes ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(benefits, '')), 'C') ||
+        setweight(to_tsvector('simple', coalesce(eligibility_criteria, '')), 'C')
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_schemes_search_vector ON schemes USING GIN (search_vector)",
+]
+
+_fts_available = False
+
+
+def ensure_search_index(engine):
+    """Create the full-text index (and its sync triggers) if missing; safe to call at every startup."""
+    global _fts_available
+    try:
+        if engine.dialect.name == "sqlite":
+            created = not inspect(engine).has_table("schemes_fts")
+            with engine.begin() as conn:
+                for statement in _SQLITE_SETUP:
+                    conn.execute(text(statement))
+                if created:
+                    conn.execute(text("INSERT INTO schemes_fts(schemes_fts) VALUES ('rebuild')"))
+            _fts_available = True
+        elif engine.dialect.name == "postgresql":
+            with engine.begin() as conn:
+                for statement in _POSTGRES_SETUP:
+                    conn.execute(text(statement))
+            _fts_available = True
+    except Exception as e:
+        logger.warning(f"Full-text index unavailable ({e}) — scheme search falls back to LIKE.")
+
+
+def search_schemes(db: Session, query: str, categories: Optional[List[str]] = None,
+                   limit: int = 20, offset: int = 0) -> List[dict]:
+    """Ranked matches for `query` → [{id, name, category, website, snippet, score}]."""
+    tokens = _TOKEN_RE.findall(query.lower())[:_MAX_TOKENS]
+    if not tokens:
+        return []
+    dialect = db.get_bind().dialect.name
+    if _fts_available and dialect == "sqlite":
+        return _search_sqlite(db, tokens, categories, limit, offset)
+    if _fts_available and dialect == "postgresql":
+        return _search_postgres(db, tokens, categories, limit, offset)
+    return _search_like(db, tokens, categories, limit, offset)
+
+
+def _category_filter(categories: Optional[List[str]], params: dict) -> str:
+    if not categories:
+        return ""
+    names = []
+    for i, category in enumerate(categories):
+        params[f"cat{i}"] = category
+        names.append(f":cat{i}")
+    return f" AND s.category IN ({', '.join(names)})"
+
+
+def _search_sqlite(db: Session, tokens, categories, limit, offset) -> List[dict]:
+    # Every token must match; each is quoted (no FTS syntax injection) and prefix-matched
+    params = {
+        "q": " ".join(f'"{t}"*' for t in tokens), "limit": limit, "offset": offset,
+        "mark_start": _MARK_START, "mark_end": _MARK_END,
+    }
+    sql = f"""
+        SELECT s.id, s.name, s.category, s.website,
+               snippet(schemes_fts, -1, :mark_start, :mark_end, '…', 16) AS snippet,
+               bm25(schemes_fts, 10.0, 3.0, 2.0, 2.0) AS rank
+        FROM schemes_fts JOIN schemes s ON s.id = schemes_fts.rowid
+        WHERE schemes_fts MATCH :q{_category_filter(categories, params)}
+        ORDER BY rank LIMIT :limit OFFSET :offset
+    """
+    return [
+        {"id": r.id, "name": r.name, "category": r.category, "website": r.website,
+         "snippet": _highlight(r.snippet), "score": round(-r.rank, 4)}
+        for r in db.execute(text(sql), params)
+    ]
+
+
+def _search_postgres(db: Session, tokens, categories, limit, offset) -> List[dict]:
+    params = {
+        "q": " & ".join(f"{t}:*" for t in tokens), "limit": limit, "offset": offset,
+        "headline": f"StartSel={_MARK_START}, StopSel={_MARK_END}, MaxWords=24, MinWords=8",
+    }
+    sql = f"""
+        SELECT s.id, s.name, s.category, s.website,
+               ts_headline('simple',
+                   concat_ws(' ', s.description, s.benefits, s.eligibility_criteria), q,
+                   :headline) AS snippet,
+               ts_rank_cd(s.search_vector, q) AS rank
+        FROM schemes s, to_tsquery('simple', :q) q
+        WHERE s.search_vector @@ q{_category_filter(categories, params)}
+        ORDER BY rank DESC, s.id LIMIT :limit OFFSET :offset
+    """
+    return [
+        {"id": r.id, "name": r.name, "category": r.category, "website": r.website,
+         "snippet": _highlight(r.snippet), "score": round(float(r.rank), 4)}
+        for r in db.execute(text(sql), params)
+    ]
+
+
+def _search_like(db: Session, tokens, categories, limit, offset) -> List[dict]:
+    fields = (Scheme.name, Scheme.description, Scheme.benefits, Scheme.eligibility_criteria)
+    query = db.query(Scheme)
+    for token in tokens:
+        query = query.filter(or_(*(field.ilike(f"%{token}%") for field in fields)))
+    if categories:
+        query = query.filter(Scheme.category.in_(categories))
+    return [
+        {"id": s.id, "name": s.name, "category": s.category, "website": s.website,
+         "snippet": html.escape((s.description or "")[:160]), "score": 0.0}
+        for s in query.order_by(Scheme.name).offset(offset).limit(limit)
+    ]
+
+
+def _highlight(snippet: Optional[str]) -> Optional[str]:
+    """HTML-escape a marked snippet, then turn the match markers into <b>…</b>."""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(_MARK_START, SNIPPET_START).replace(_MARK_END, SNIPPET_END)
@@ -0,0 +1,77 @@
+"""
+Snapshot Cache — Stale-while-revalidate caching for expensive read-only computations.
+
+A cached value younger than `ttl` is served as is. An older one is still served
+immediately while a single background refresh recomputes it; only values older than
+`max_stale` (or never computed / invalidated) make the caller wait. Concurrent
+callers share one in-flight computation (single-flight).
+"""
+import time
+import asyncio
+import logging
+from typing import Any, Callable, Optional, Tuple
+
+from database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotCache:
+    def __init__(self, name: str, compute: Callable[[Any], Any], ttl: float, max_stale: float):
+        """`compute(db)` runs in a worker thread with its own session."""
+        self.name = name
+        self.compute = compute
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._value: Any = None
+        self._computed_at: Optional[float] = None
+        self._generation = 0
+        self._inflight: Optional[asyncio.Task] = None
+
+    async def get(self) -> Tuple[Any, float]:
+        """Return (value, age in seconds)."""
+        while True:
+            age = self.age()
+            if age is not None and age <= self.ttl:
+                return self._value, age
+
+            task = self._refresh()
+            if age is not None and age <= self.max_stale:
+                return self._value, age  # Serve stale; the refresh runs in the background
+
+            if not await asyncio.shield(task):
+                if self._computed_at is None:
+                    raise RuntimeError(f"Could not compute the {self.name} snapshot.")
+                return self._value, self.age()  # Refresh failed — better stale than nothing
+            # Loop: returns the fresh value, or recomputes if invalidated meanwhile
+
+    def age(self) -> Optional[float]:
+        return None if self._computed_at is None else time.monotonic() - self._computed_at
+
+    def invalidate(self):
+        """Drop the cached value; the next request recomputes it and any in-flight result is discarded."""
+        self._generation += 1
+        self._value = None
+        self._computed_at = None
+        self._inflight = None
+
+    def _refresh(self) -> asyncio.Task:
+        loop = asyncio.get_running_loop()
+        if self._inflight is None or self._inflight.done() or self._inflight.get_loop() is not loop:
+            self._inflight = loop.create_task(self._run(self._generation))
+        return self._inflight
+
+    async def _run(self, generation: int) -> bool:
+        try:
+            value = await asyncio.to_thread(self._compute)
+        except Exception as e:
+            logger.error(f"Snapshot '{self.name}' refresh failed: {e}")
+            return False
+        if generation == self._generation:
+            self._value = value
+            self._computed_at = time.monotonic()
+        return True
+
+    def _compute(self):
+        with SessionLocal() as db:
+            return self.compute(db)
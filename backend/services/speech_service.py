@@ -1,49 +1,262 @@
 """
-Speech Service — Whisper (STT) and gTTS (TTS) integration.
+Speech Service — Whisper (STT) and pluggable TTS integration.
 """
+import io
 import os
-import uuid
+import gzip
+import re
+import wave
+import struct
+import asyncio
+import hashlib
 import logging
-from pathlib import Path
+import threading
+from typing import AsyncIterator, Dict, List, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from services import tts_backends
+from services.storage import BlobNotFoundError, get_storage
 
 logger = logging.getLogger(__name__)
 
-# Audio output directory
-AUDIO_DIR = Path("backend/static/audio")
-AUDIO_DIR.mkdir(parents=True, exist_ok=True)
+# Storage key prefix for generated audio (see services/storage.py)
+AUDIO_PREFIX = "audio"
+
+# Speech-to-text settings. STT_BASE_URL points the client at any OpenAI-compatible
+# transcription server (e.g. a local stub or self-hosted Whisper).
+STT_BASE_URL = os.getenv("STT_BASE_URL", "")
+STT_MODEL = os.getenv("STT_MODEL", "whisper-1")
+STT_CONCURRENCY = int(os.getenv("STT_CONCURRENCY", "4"))
+STT_TIMEOUT_SECONDS = float(os.getenv("STT_TIMEOUT", "30"))
+MAX_AUDIO_BYTES = int(os.getenv("MAX_AUDIO_MB", "10")) * 1024 * 1024
+
+# Text-to-speech settings
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", "4"))
+TTS_MAX_SENTENCE_CHARS = 300
+# Write .gz siblings for WAV output (served to clients that accept gzip); MP3 does not compress
+AUDIO_PRECOMPRESS = os.getenv("AUDIO_PRECOMPRESS", "").lower() in ("1", "true", "yes")
+
+_READ_CHUNK = 64 * 1024
+
+_tts_pool = ThreadPoolExecutor(max_workers=TTS_WORKERS, thread_name_prefix="tts")
+
+# Sentence syntheses queued or running on _tts_pool, by storage key (shared by all callers)
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+_stt_client = None
+_stt_semaphore = asyncio.Semaphore(STT_CONCURRENCY)
+
+
+class AudioTooLargeError(ValueError):
+    """Raised when an audio upload exceeds MAX_AUDIO_BYTES while streaming."""
+
+
+def _get_stt_client():
+    """Lazy-load the async transcription client (None when no key or server is configured)."""
+    global _stt_client
+    if _stt_client is None:
+        api_key = os.getenv("OPENAI_API_KEY", "")
+        if api_key == "your_openai_api_key_here":
+            api_key = ""
+        if not api_key and not STT_BASE_URL:
+            return None
+        try:
+            from openai import AsyncOpenAI
+            _stt_client = AsyncOpenAI(
+                api_key=api_key or "local",
+                base_url=STT_BASE_URL or None,
+                timeout=STT_TIMEOUT_SECONDS,
+                max_retries=0,
+            )
+        except Exception as e:
+            logger.warning(f"Could not initialize transcription client: {e}")
+    return _stt_client
 
 
-async def transcribe_audio(file_path: str) -> str:
-    """Uses OpenAI Whisper API to transcribe audio file to text."""
-    api_key = os.getenv("OPENAI_API_KEY", "")
-    if not api_key or api_key == "your_openai_api_key_here":
+async def read_audio_upload(file, max_bytes: int | None = None) -> bytes:
+    """Read an UploadFile into memory in chunks, enforcing the size cap as bytes arrive."""
+    max_bytes = max_bytes or MAX_AUDIO_BYTES
+    chunks = []
+    size = 0
+    while chunk := await file.read(_READ_CHUNK):
+        size += len(chunk)
+        if size > max_bytes:
+            raise AudioTooLargeError(f"Audio is larger than the {max_bytes // (1024 * 1024)} MB limit.")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def transcribe_audio(audio: bytes, filename: str = "recording.webm",
+                           content_type: str = "audio/webm") -> str:
+    """Transcribe in-memory audio with Whisper (or a compatible server) without blocking the event loop."""
+    client = _get_stt_client()
+    if not client:
         logger.warning("No OpenAI API key — returning mock transcription.")
         return "I would like to know about government housing schemes."
 
     try:
-        import openai
-        client = openai.OpenAI(api_key=api_key)
-        with open(file_path, "rb") as audio_file:
-            transcript = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file
+        async with _stt_semaphore:
+            transcript = await asyncio.wait_for(
+                client.audio.transcriptions.create(
+                    model=STT_MODEL,
+                    file=(filename, audio, content_type),
+                ),
+                timeout=STT_TIMEOUT_SECONDS,
             )
         return transcript.text
+    except asyncio.TimeoutError:
+        logger.error(f"Whisper transcription timed out after {STT_TIMEOUT_SECONDS}s")
+        return "Sorry, I could not transcribe the audio. Please try again or type your question."
     except Exception as e:
         logger.error(f"Whisper transcription error: {e}")
         return "Sorry, I could not transcribe the audio. Please try again or type your question."
 
 
-def text_to_speech(text: str, lang: str = 'en') -> str:
-    """Converts text to speech using gTTS and returns the file path."""
-    try:
-        from gtts import gTTS
+async def iter_speech(text: str, lang: str = "en") -> AsyncIterator[bytes]:
+    """
+    Yield the spoken text as one continuous audio stream, sentence by sentence.
+    All sentences are queued on the TTS pool at once (joining any synthesis already in
+    flight, e.g. from prefetch_speech); each is yielded as soon as it and the sentences
+    before it are ready, so playback starts after the first one. Sentences are not
+    cancelled if the client leaves — other streams may share them, and they are cached.
+    """
+    futures = [_submit_sentence(sentence, lang) for sentence in split_sentences(text)]
+    header_sent = False
+    for future in futures:
+        try:
+            audio, backend = await asyncio.shield(asyncio.wrap_future(future))
+        except Exception as e:
+            logger.error(f"TTS error: {e}")
+            continue  # Skip the sentence rather than cut the answer off
+        if backend.extension == ".wav":
+            params, frames = _wav_frames(audio)
+            if not header_sent:
+                yield _streaming_wav_header(params)
+                header_sent = True
+            yield frames
+        else:
+            yield audio
 
-        tts = gTTS(text=text[:500], lang=lang, slow=False)  # Limit text length
-        filename = f"{uuid.uuid4()}.mp3"
-        filepath = AUDIO_DIR / filename
-        tts.save(str(filepath))
-        return str(filepath)
-    except Exception as e:
-        logger.error(f"TTS error: {e}")
-        return ""
+
+def prefetch_speech(text: str, lang: str = "en", sentences: int = 2):
+    """Start synthesizing the first sentences in the background so streamed playback starts sooner."""
+    for sentence in split_sentences(text)[:sentences]:
+        _submit_sentence(sentence, lang).add_done_callback(_log_prefetch_error)
+
+
+def speech_media_type(lang: str = "en") -> str:
+    return tts_backends.get_backend(lang).media_type
+
+
+def synthesize_sentence(sentence: str, lang: str = "en") -> Tuple[bytes, tts_backends.TTSBackend]:
+    """Synthesize one sentence, reusing the stored audio for identical (voice, lang, sentence)."""
+    backend = tts_backends.get_backend(lang)
+    key = _cache_key(backend, lang, sentence)
+    storage = get_storage()
+    if storage.exists(key):
+        try:
+            return storage.read(key), backend
+        except BlobNotFoundError:
+            pass  # Evicted between the check and the read
+
+    audio, backend = tts_backends.synthesize(sentence, lang)
+    _store_audio(key, audio, backend)
+    return audio, backend
+
+
+async def synthesize_sentence_url(sentence: str, lang: str = "en") -> str:
+    """
+    Synthesize one sentence on the TTS pool (cached, and shared with any identical
+    sentence in flight) and return the URL clients should fetch it from.
+    """
+    _audio, backend = await asyncio.shield(asyncio.wrap_future(_submit_sentence(sentence, lang)))
+    return get_storage().url(_cache_key(backend, lang, sentence))
+
+
+def audio_key(name: str, extension: str = "") -> str:
+    """Storage key for a generated audio file."""
+    return f"{AUDIO_PREFIX}/{name}{extension}"
+
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?।॥])\s+|\n+")
+_MARKUP_RE = re.compile(r"[*#_`•]+")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into speakable sentences; very short fragments are merged, long ones split on commas."""
+    sentences: List[str] = []
+    carry = ""
+    for piece in _SENTENCE_RE.split(text or ""):
+        piece = _MARKUP_RE.sub("", piece).strip(" -\t")
+        if not piece:
+            continue
+        piece = f"{carry} {piece}".strip() if carry else piece
+        if len(piece) < 20:
+            carry = piece
+            continue
+        carry = ""
+        while len(piece) > TTS_MAX_SENTENCE_CHARS:
+            cut = piece.rfind(", ", 0, TTS_MAX_SENTENCE_CHARS)
+            cut = cut + 1 if cut > 0 else TTS_MAX_SENTENCE_CHARS
+            sentences.append(piece[:cut].strip())
+            piece = piece[cut:].strip()
+        if piece:
+            sentences.append(piece)
+    if carry:
+        sentences.append(carry)
+    return sentences
+
+
+def _submit_sentence(sentence: str, lang: str) -> Future:
+    """Queue synthesize_sentence on the TTS pool, or join the identical sentence already in flight."""
+    backend = tts_backends.get_backend(lang)
+    key = _cache_key(backend, lang, sentence)
+    with _inflight_lock:
+        future = _inflight.get(key)
+        if future is None:
+            future = _tts_pool.submit(synthesize_sentence, sentence, lang)
+            _inflight[key] = future
+    future.add_done_callback(lambda done: _discard_inflight(key, done))
+    return future
+
+
+def _discard_inflight(key: str, future: Future):
+    with _inflight_lock:
+        if _inflight.get(key) is future:
+            del _inflight[key]
+
+
+def _log_prefetch_error(future: Future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.warning(f"TTS prefetch failed: {future.exception()}")
+
+
+def _cache_key(backend: tts_backends.TTSBackend, lang: str, text: str) -> str:
+    """Storage key for the audio of `text`; includes the voice, so new voices get new files."""
+    digest = hashlib.sha256(f"{backend.voice(lang)}|{lang}|{text}".encode("utf-8")).hexdigest()
+    return audio_key(digest, backend.extension)
+
+
+def _store_audio(key: str, data: bytes, backend: tts_backends.TTSBackend):
+    storage = get_storage()
+    if AUDIO_PRECOMPRESS and backend.extension == ".wav":
+        compressed = gzip.compress(data, compresslevel=9)
+        if len(compressed) < len(data) * 0.9:
+            storage.put(key + ".gz", compressed, backend.media_type)
+    storage.put(key, data, backend.media_type)
+
+
+def _wav_frames(data: bytes):
+    with wave.open(io.BytesIO(data), "rb") as wav:
+        return wav.getparams(), wav.readframes(wav.getnframes())
+
+
+def _streaming_wav_header(params) -> bytes:
+    """WAV header with an open-ended data size, for streaming frames of unknown total length."""
+    byte_rate = params.framerate * params.nchannels * params.sampwidth
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 0xFFFFFFFF, b"WAVE", b"fmt ", 16, 1, params.nchannels, params.framerate,
+        byte_rate, params.nchannels * params.sampwidth, params.sampwidth * 8, b"data", 0xFFFFFFFF - 36,
+    )
@@ -0,0 +1,291 @@
+"""
+Blob Storage — Pluggable storage for generated audio and other binary artifacts.
+
+Backends (STORAGE_BACKEND):
+  local   — files under STORAGE_ROOT (default: backend/static), served at /static/<key>
+  memory  — in-process LRU bounded by STORAGE_MEMORY_MB (serverless / read-only filesystems)
+  s3      — any S3-compatible service (AWS S3, MinIO, R2) via boto3; clients fetch
+            objects directly through public or presigned URLs instead of the app server
+
+Keys are slash-separated paths such as "audio/<sha256>.mp3". A backend that cannot be
+initialized is an error — there is no silent fallback, which would split blobs across
+instances of a multi-instance deploy.
+"""
+import os
+import threading
+import logging
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local")
+STORAGE_ROOT = Path(os.getenv("STORAGE_ROOT", Path(__file__).resolve().parent.parent / "static"))
+STORAGE_MEMORY_BYTES = int(os.getenv("STORAGE_MEMORY_MB", "64")) * 1024 * 1024
+
+S3_BUCKET = os.getenv("S3_BUCKET", "")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL", "")        # e.g. http://localhost:9000 for MinIO
+S3_REGION = os.getenv("S3_REGION", "us-east-1")
+S3_PUBLIC_BASE_URL = os.getenv("S3_PUBLIC_BASE_URL", "")  # CDN / public bucket URL; presigned if empty
+S3_PRESIGN_SECONDS = int(os.getenv("S3_PRESIGN_SECONDS", "3600"))
+
+_CHUNK = 64 * 1024
+
+Data = Union[bytes, Iterable[bytes]]
+
+
+class BlobNotFoundError(LookupError):
+    """Raised by open()/read() in every backend when the key does not exist."""
+
+
+@dataclass
+class BlobInfo:
+    size: int
+    modified: Optional[datetime] = None
+
+
+class BlobStorage(ABC):
+    """Interface implemented by every backend."""
+    name = "base"
+    # True when url() points somewhere other than this app (no proxying needed)
+    serves_directly = False
+
+    @abstractmethod
+    def put(self, key: str, data: Data, content_type: str = "application/octet-stream") -> None:
+        """Store a blob, replacing any existing one under the key."""
+
+    @abstractmethod
+    def open(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Stream bytes [start, end) of a blob. Raises BlobNotFoundError if it does not exist."""
+
+    @abstractmethod
+    def stat(self, key: str) -> Optional[BlobInfo]:
+        """Size and modification time of a blob, or None if it does not exist."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove a blob (no error if it does not exist)."""
+
+    def url(self, key: str) -> str:
+        return f"/static/{key}"
+
+    def exists(self, key: str) -> bool:
+        return self.stat(key) is not None
+
+    def read(self, key: str) -> bytes:
+        return b"".join(self.open(key))
+
+
+class LocalDiskStorage(BlobStorage):
+    name = "local"
+
+    def __init__(self, root: Path = STORAGE_ROOT):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root.resolve() not in path.parents:
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def put(self, key: str, data: Data, content_type: str = "application/octet-stream") -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            for chunk in _chunks(data):
+                f.write(chunk)
+        os.replace(tmp, path)  # Atomic: readers never see a partial file
+
+    def open(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        try:
+            f = open(self._path(key), "rb")
+        except FileNotFoundError:
+            raise BlobNotFoundError(key) from None
+        with f:
+            f.seek(start)
+            remaining = None if end is None else end - start
+            while remaining is None or remaining > 0:
+                chunk = f.read(_CHUNK if remaining is None else min(_CHUNK, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def stat(self, key: str) -> Optional[BlobInfo]:
+        try:
+            st = self._path(key).stat()
+        except (FileNotFoundError, ValueError):
+            return None
+        return BlobInfo(size=st.st_size, modified=datetime.utcfromtimestamp(st.st_mtime))
+
+    def delete(self, key: str) -> None:
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+
+class MemoryStorage(BlobStorage):
+    """Size-bounded LRU kept in process memory. Blobs are lost on restart."""
+    name = "memory"
+
+    def __init__(self, max_bytes: int = STORAGE_MEMORY_BYTES):
+        self.max_bytes = max_bytes
+        self._blobs: "OrderedDict[str, tuple]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def put(self, key: str, data: Data, content_type: str = "application/octet-stream") -> None:
+        blob = b"".join(_chunks(data))
+        with self._lock:
+            if key in self._blobs:
+                self._size -= len(self._blobs.pop(key)[0])
+            self._blobs[key] = (blob, datetime.utcnow())
+            self._size += len(blob)
+            while self._size > self.max_bytes and len(self._blobs) > 1:
+                _key, (evicted, _) = self._blobs.popitem(last=False)
+                self._size -= len(evicted)
+
+    def open(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        with self._lock:
+            entry = self._blobs.get(key)
+            if entry is None:
+                raise BlobNotFoundError(key)
+            blob, _ = entry
+            self._blobs.move_to_end(key)
+        view = memoryview(blob)[start:end]
+        for offset in range(0, len(view), _CHUNK):
+            yield bytes(view[offset:offset + _CHUNK])
+
+    def stat(self, key: str) -> Optional[BlobInfo]:
+        with self._lock:
+            entry = self._blobs.get(key)
+        if entry is None:
+            return None
+        return BlobInfo(size=len(entry[0]), modified=entry[1])
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            entry = self._blobs.pop(key, None)
+            if entry:
+                self._size -= len(entry[0])
+
+
+class S3Storage(BlobStorage):
+    """S3-compatible object storage (boto3). Works with MinIO via S3_ENDPOINT_URL."""
+    name = "s3"
+    serves_directly = True
+
+    def __init__(self, bucket: str = S3_BUCKET, endpoint_url: str = S3_ENDPOINT_URL,
+                 region: str = S3_REGION, public_base_url: str = S3_PUBLIC_BASE_URL):
+        import boto3
+        from botocore.config import Config
+
+        if not bucket:
+            raise RuntimeError("S3_BUCKET must be set when STORAGE_BACKEND=s3.")
+        self.bucket = bucket
+        self.public_base_url = public_base_url.rstrip("/")
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url or None,
+            region_name=region,
+            config=Config(s3={"addressing_style": "path" if endpoint_url else "auto"}),
+        )
+
+    def put(self, key: str, data: Data, content_type: str = "application/octet-stream") -> None:
+        body = data if isinstance(data, (bytes, bytearray)) else _IterableReader(data)
+        self.client.upload_fileobj(
+            _as_fileobj(body), self.bucket, key,
+            ExtraArgs={"ContentType": content_type, "CacheControl": "public, max-age=31536000, immutable"},
+        )
+
+    def open(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        from botocore.exceptions import ClientError
+        kwargs = {}
+        if start or end is not None:
+            kwargs["Range"] = f"bytes={start}-{'' if end is None else end - 1}"
+        try:
+            body = self.client.get_object(Bucket=self.bucket, Key=key, **kwargs)["Body"]
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                raise BlobNotFoundError(key) from None
+            raise
+        try:
+            yield from body.iter_chunks(_CHUNK)
+        finally:
+            body.close()
+
+    def stat(self, key: str) -> Optional[BlobInfo]:
+        from botocore.exceptions import ClientError
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError:
+            return None
+        return BlobInfo(size=head["ContentLength"], modified=head.get("LastModified"))
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def url(self, key: str) -> str:
+        if self.public_base_url:
+            return f"{self.public_base_url}/{key}"
+        return self.client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": key}, ExpiresIn=S3_PRESIGN_SECONDS,
+        )
+
+
+_storage: Optional[BlobStorage] = None
+
+
+def get_storage() -> BlobStorage:
+    """Lazy-load the configured storage backend; raises RuntimeError if it is unusable."""
+    global _storage
+    if _storage is None:
+        backends = {"local": LocalDiskStorage, "memory": MemoryStorage, "s3": S3Storage}
+        if STORAGE_BACKEND not in backends:
+            raise RuntimeError(
+                f"Unknown STORAGE_BACKEND '{STORAGE_BACKEND}'. Use one of: {', '.join(backends)}."
+            )
+        try:
+            _storage = backends[STORAGE_BACKEND]()
+        except Exception as e:
+            raise RuntimeError(f"Could not initialize '{STORAGE_BACKEND}' storage: {e}") from e
+    return _storage
+
+
+def _chunks(data: Data) -> Iterator[bytes]:
+    if isinstance(data, (bytes, bytearray)):
+        yield bytes(data)
+    else:
+        yield from data
+
+
+def _as_fileobj(body):
+    import io
+    return io.BytesIO(body) if isinstance(body, (bytes, bytearray)) else body
+
+
+class _IterableReader:
+    """File-like wrapper over an iterable of byte chunks, for streaming uploads."""
+
+    def __init__(self, iterable: Iterable[bytes]):
+        self._iter = iter(iterable)
+        self._buffer = b""
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            try:
+                self._buffer += next(self._iter)
+            except StopIteration:
+                break
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
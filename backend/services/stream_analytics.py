@@ -0,0 +1,339 @@
+"""
+Stream Analytics — Constant-memory live counters fed by each logged interaction.
+
+  * HyperLogLog of distinct user_ids (≈0.8% error in 16 KB)
+  * Count-Min sketch of normalized queries with a top-K heap of trending questions
+  * Exact per-persona counters
+
+Each process counts the current UTC day into an in-memory delta. Every
+ANALYTICS_SNAPSHOT_SECONDS (and at shutdown) the delta is merged into the day's
+analytics_snapshots row — register-wise max for the HyperLogLog, addition for the
+Count-Min table and counters — so any number of worker processes share one set of
+daily counts and a restart never counts anything twice. Reads combine the stored row
+with this process's unsaved delta.
+"""
+import os
+import re
+import json
+import math
+import heapq
+import asyncio
+import hashlib
+import logging
+import threading
+from array import array
+from datetime import date, datetime
+from typing import Optional
+
+from database import SessionLocal
+from models import AnalyticsSnapshot
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_SECONDS = int(os.getenv("ANALYTICS_SNAPSHOT_SECONDS", "60"))
+TOP_K = int(os.getenv("ANALYTICS_TOP_K", "50"))
+
+HLL_PRECISION = 14          # 2^14 registers
+CMS_WIDTH = 2048
+CMS_DEPTH = 4
+MAX_QUERY_CHARS = 200
+
+_NON_WORD_RE = re.compile(r"[^\w\s]+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def _hash64(value: str, salt: int = 0) -> int:
+    digest = hashlib.blake2b(value.encode("utf-8"), digest_size=8, salt=salt.to_bytes(16, "little")).digest()
+    return int.from_bytes(digest, "little")
+
+
+class HyperLogLog:
+    """Distinct-count estimator with 2^precision one-byte registers."""
+
+    def __init__(self, precision: int = HLL_PRECISION, registers: Optional[bytes] = None):
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = bytearray(registers) if registers else bytearray(self.m)
+
+    def add(self, value: str):
+        h = _hash64(value)
+        index = h & (self.m - 1)
+        rest = h >> self.precision
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m * self.m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.m and zeros:
+            estimate = self.m * math.log(self.m / zeros)   # Linear counting for small cardinalities
+        return int(round(estimate))
+
+    def merge(self, other: "HyperLogLog"):
+        """Union with another sketch of the same precision (register-wise max)."""
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
+
+
+class CountMinSketch:
+    """Approximate frequency counts; never under-counts, over-counts by ≈ total·e/width."""
+
+    def __init__(self, width: int = CMS_WIDTH, depth: int = CMS_DEPTH, table: Optional[bytes] = None):
+        self.width = width
+        self.depth = depth
+        self.rows = [array("I", bytes(4 * width)) for _ in range(depth)]
+        if table:
+            for i, row in enumerate(self.rows):
+                row[:] = array("I", table[i * 4 * width:(i + 1) * 4 * width])
+
+    def add(self, value: str, count: int = 1) -> int:
+        """Add and return the new estimate for `value`."""
+        estimate = None
+        for i, row in enumerate(self.rows):
+            j = _hash64(value, i) % self.width
+            row[j] += count
+            estimate = row[j] if estimate is None else min(estimate, row[j])
+        return estimate
+
+    def estimate(self, value: str) -> int:
+        return min(row[_hash64(value, i) % self.width] for i, row in enumerate(self.rows))
+
+    def merge(self, other: "CountMinSketch"):
+        """Add another sketch of the same shape (counts of the union of both streams)."""
+        for row, other_row in zip(self.rows, other.rows):
+            row[:] = array("I", map(int.__add__, row, other_row))
+
+    def to_bytes(self) -> bytes:
+        return b"".join(row.tobytes() for row in self.rows)
+
+
+class TopK:
+    """
+    The K heaviest items seen, as a min-heap on their sketch estimates. Updating an
+    item pushes a new entry and leaves the old one stale (estimates only grow); stale
+    entries are skipped when evicting, so offer() is O(log K) amortized.
+    """
+
+    def __init__(self, k: int = TOP_K, items: Optional[dict] = None):
+        self.k = k
+        self.counts: dict = dict(heapq.nlargest(k, (items or {}).items(), key=lambda x: x[1]))
+        self._rebuild()
+
+    def offer(self, item: str, count: int):
+        if item in self.counts:
+            self.counts[item] = count
+            heapq.heappush(self.heap, (count, item))
+            if len(self.heap) > 4 * self.k:
+                self._rebuild()
+        elif len(self.counts) < self.k:
+            self.counts[item] = count
+            heapq.heappush(self.heap, (count, item))
+        else:
+            while self.counts.get(self.heap[0][1]) != self.heap[0][0]:
+                heapq.heappop(self.heap)   # Stale entry
+            if count > self.heap[0][0]:
+                _old_count, evicted = heapq.heapreplace(self.heap, (count, item))
+                del self.counts[evicted]
+                self.counts[item] = count
+
+    def _rebuild(self):
+        self.heap = [(count, item) for item, count in self.counts.items()]
+        heapq.heapify(self.heap)
+
+    def top(self, limit: int) -> list:
+        return sorted(self.counts.items(), key=lambda x: (-x[1], x[0]))[:limit]
+
+
+class DayStats:
+    """All live counters for one UTC day (a stored snapshot, or a process's unsaved delta)."""
+
+    def __init__(self, day: date, snapshot: Optional[AnalyticsSnapshot] = None):
+        self.day = day
+        self.users = HyperLogLog(registers=snapshot.hll if snapshot else None)
+        self.queries = CountMinSketch(table=snapshot.cms if snapshot else None)
+        self.trending = TopK(items=json.loads(snapshot.top_queries) if snapshot else None)
+        self.personas: dict = json.loads(snapshot.persona_counts) if snapshot else {}
+        self.interactions = snapshot.interactions if snapshot else 0
+        self.dirty = False
+
+    def record(self, user_id: Optional[str], query: str, persona: Optional[str]):
+        self.interactions += 1
+        if user_id:
+            self.users.add(user_id)
+        normalized = normalize_query(query)
+        if normalized:
+            self.trending.offer(normalized, self.queries.add(normalized))
+        if persona:
+            self.personas[persona] = self.personas.get(persona, 0) + 1
+        self.dirty = True
+
+    def merge(self, other: "DayStats"):
+        """Fold in counts for the same day from another process or delta."""
+        self.users.merge(other.users)
+        self.queries.merge(other.queries)
+        candidates = set(self.trending.counts) | set(other.trending.counts)
+        self.trending = TopK(items={query: self.queries.estimate(query) for query in candidates})
+        for persona, count in other.personas.items():
+            self.personas[persona] = self.personas.get(persona, 0) + count
+        self.interactions += other.interactions
+        self.dirty = self.dirty or other.dirty
+
+    def to_snapshot(self) -> dict:
+        return {
+            "hll": self.users.to_bytes(),
+            "cms": self.queries.to_bytes(),
+            "top_queries": json.dumps(self.trending.counts, ensure_ascii=False),
+            "persona_counts": json.dumps(self.personas, ensure_ascii=False),
+            "interactions": self.interactions,
+            "updated_at": datetime.utcnow(),
+        }
+
+
+_delta: Optional[DayStats] = None       # This process's counts not yet merged into the store
+_unsaved: list = []                     # Earlier days' deltas (or failed merges) awaiting a snapshot
+_stored: Optional[DayStats] = None      # Today's stored row as last read, for cheap query_count()
+_lock = threading.Lock()
+_snapshot_task = None
+_snapshot_loop = None
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace so rephrasings count together."""
+    text = _NON_WORD_RE.sub(" ", (query or "").lower())
+    return _SPACE_RE.sub(" ", text).strip()[:MAX_QUERY_CHARS]
+
+
+def record_interaction(user_id: Optional[str], query: str, persona: Optional[str]):
+    """In-memory update of today's counters — no database I/O on the request path."""
+    global _delta
+    today = datetime.utcnow().date()
+    with _lock:
+        if _delta is None or _delta.day != today:
+            if _delta is not None and _delta.dirty:
+                _unsaved.append(_delta)
+            _delta = DayStats(today)
+        _delta.record(user_id, query, persona)
+    _ensure_snapshot_task()
+
+
+def live_stats(limit: int = 10, day: Optional[date] = None) -> dict:
+    """
+    Unique users, interaction count, persona counts and trending queries for a day
+    (default today): the stored counts of all processes plus this process's unsaved ones.
+    Reads the database — call off the event loop.
+    """
+    global _stored
+    today = datetime.utcnow().date()
+    day = day or today
+    with SessionLocal() as db:
+        row = db.get(AnalyticsSnapshot, day)
+        stats = DayStats(day, row)
+        if day == today:
+            _stored = DayStats(day, row)
+    with _lock:
+        for pending in _pending():
+            if pending.day == day:
+                stats.merge(pending)
+    return _stats(stats, limit)
+
+
+def query_count(query: str) -> int:
+    """Today's estimated count for a query (after normalization), without database I/O."""
+    normalized = normalize_query(query)
+    if not normalized:
+        return 0
+    today = datetime.utcnow().date()
+    stored = _stored
+    count = stored.queries.estimate(normalized) if stored is not None and stored.day == today else 0
+    with _lock:
+        return count + sum(p.queries.estimate(normalized) for p in _pending() if p.day == today)
+
+
+def snapshot():
+    """
+    Merge this process's unsaved counts into the stored day rows, then re-read today's
+    row so query_count() sees other processes' counts. Deltas whose merge fails are kept
+    and retried on the next snapshot.
+    """
+    global _delta
+    with _lock:
+        pending = [stats for stats in _pending() if stats.dirty]
+        _unsaved.clear()
+        if _delta is not None and _delta.dirty:
+            _delta = DayStats(_delta.day)
+    failed = [stats for stats in pending if not _merge_into_store(stats)]
+    if failed:
+        with _lock:
+            _unsaved.extend(failed)
+    _refresh_stored()
+
+
+def _stats(stats: DayStats, limit: int) -> dict:
+    return {
+        "day": stats.day.isoformat(),
+        "unique_users": stats.users.count(),
+        "interactions": stats.interactions,
+        "persona_counts": dict(sorted(stats.personas.items(), key=lambda x: -x[1])),
+        "trending_queries": [{"query": q, "count": c} for q, c in stats.trending.top(limit)],
+    }
+
+
+def _pending() -> list:
+    """Unsaved deltas, oldest first. Caller holds _lock."""
+    return _unsaved + ([_delta] if _delta is not None else [])
+
+
+def _refresh_stored():
+    global _stored
+    today = datetime.utcnow().date()
+    try:
+        with SessionLocal() as db:
+            _stored = DayStats(today, db.get(AnalyticsSnapshot, today))
+    except Exception as e:
+        logger.error(f"Analytics snapshot read failed: {e}")
+
+
+def _merge_into_store(stats: DayStats) -> bool:
+    """Add a delta to its day's stored row (row-locked where the database supports it)."""
+    try:
+        with SessionLocal() as db:
+            row = (
+                db.query(AnalyticsSnapshot)
+                .filter(AnalyticsSnapshot.day == stats.day)
+                .with_for_update()
+                .first()
+            )
+            if row is None:
+                db.add(AnalyticsSnapshot(day=stats.day, **stats.to_snapshot()))
+            else:
+                merged = DayStats(stats.day, row)
+                merged.merge(stats)
+                for key, value in merged.to_snapshot().items():
+                    setattr(row, key, value)
+            db.commit()
+        return True
+    except Exception as e:
+        logger.error(f"Analytics snapshot failed: {e}")
+        return False
+
+
+def _ensure_snapshot_task():
+    """Lazily start the periodic snapshot task on the running event loop."""
+    global _snapshot_task, _snapshot_loop
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    if _snapshot_loop is not loop or _snapshot_task is None or _snapshot_task.done():
+        _snapshot_loop = loop
+        _snapshot_task = loop.create_task(_snapshot_periodically())
+
+
+async def _snapshot_periodically():
+    while True:
+        await asyncio.sleep(SNAPSHOT_SECONDS)
+        await asyncio.to_thread(snapshot)
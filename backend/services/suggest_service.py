@@ -0,0 +1,214 @@
+"""
+Suggest Service — In-memory typeahead over a compressed (radix) trie.
+
+Entries come from scheme names, categories, synonym keywords and persona quick-action
+queries, and are weighted by popularity (scheme matches, category rollups, today's
+query counts). Every node stores its precomputed top suggestions, so a lookup is a
+walk down the prefix plus a slice — no database access on the hot path.
+The trie is rebuilt when the catalog version changes or the weights grow stale; the
+check and the rebuild run on a background thread while the previous trie keeps serving.
+"""
+import os
+import time
+import heapq
+import logging
+import threading
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Scheme
+from persona_config import PERSONA_QUICK_ACTIONS, KEYWORD_SYNONYMS
+from services import analytics_service, catalog_service, stream_analytics
+from services.stream_analytics import normalize_query
+
+logger = logging.getLogger(__name__)
+
+SUGGEST_TOP_K = 10
+SUGGEST_REFRESH_SECONDS = int(os.getenv("SUGGEST_REFRESH_SECONDS", "600"))
+SUGGEST_VERSION_CHECK_SECONDS = float(os.getenv("SUGGEST_VERSION_CHECK_SECONDS", "5"))
+
+# Base weights per kind; popularity is added on top
+_BASE_WEIGHTS = {"scheme": 10, "category": 8, "query": 6, "topic": 4}
+
+
+class _Node:
+    __slots__ = ("edges", "entries", "top")
+
+    def __init__(self):
+        self.edges: dict = {}       # first char → (label, child)
+        self.entries: list = []     # Entries whose key ends here
+        self.top: list = []         # Best entries in this subtree, highest weight first
+
+
+class RadixTrie:
+    """Compressed trie mapping keys to weighted entries (weight, text, kind, scheme_id)."""
+
+    def __init__(self, top_k: int = SUGGEST_TOP_K):
+        self.root = _Node()
+        self.top_k = top_k
+        self.size = 0
+
+    def insert(self, key: str, entry: tuple):
+        node = self.root
+        while key:
+            edge = node.edges.get(key[0])
+            if edge is None:
+                child = _Node()
+                node.edges[key[0]] = (key, child)
+                node = child
+                break
+            label, child = edge
+            common = _common_prefix(label, key)
+            if common < len(label):
+                # Split the edge at the point where the key diverges
+                middle = _Node()
+                middle.edges[label[common]] = (label[common:], child)
+                node.edges[key[0]] = (label[:common], middle)
+                child = middle
+            node, key = child, key[common:]
+        node.entries.append(entry)
+        self.size += 1
+
+    def finalize(self):
+        """Precompute each node's top entries (call once after all inserts)."""
+        self._finalize(self.root)
+
+    def _finalize(self, node: _Node) -> list:
+        candidates = list(node.entries)
+        for _label, child in node.edges.values():
+            candidates.extend(self._finalize(child))
+        best: dict = {}
+        for entry in candidates:   # One suggestion per text, at its highest weight
+            if entry[1] not in best or entry[0] > best[entry[1]][0]:
+                best[entry[1]] = entry
+        node.top = heapq.nsmallest(self.top_k, best.values(), key=lambda e: (-e[0], e[1]))
+        return node.top
+
+    def search(self, prefix: str, limit: int) -> list:
+        node, key = self.root, prefix
+        while key:
+            edge = node.edges.get(key[0])
+            if edge is None:
+                return []
+            label, child = edge
+            if key.startswith(label):
+                node, key = child, key[len(label):]
+            elif label.startswith(key):
+                return child.top[:limit]
+            else:
+                return []
+        return node.top[:limit]
+
+
+_trie: Optional[RadixTrie] = None
+_trie_version: Optional[int] = None
+_built_at = 0.0
+_checked_at = 0.0
+_lock = threading.Lock()    # Held while checking/rebuilding (by a request or the refresh thread)
+
+
+def suggest(prefix: str, limit: int = 8) -> List[dict]:
+    """Top suggestions whose text (or any word in it) starts with `prefix`."""
+    key = normalize_query(prefix)
+    if not key:
+        return []
+    trie = _get_trie()
+    return [
+        {"text": text, "kind": kind, "scheme_id": scheme_id}
+        for _weight, text, kind, scheme_id in trie.search(key, limit)
+    ]
+
+
+def invalidate():
+    """Rebuild on the next request; the current trie keeps serving until then."""
+    global _trie_version, _checked_at
+    _trie_version = None
+    _checked_at = 0.0
+
+
+def _get_trie() -> RadixTrie:
+    """
+    The current trie, from memory. Only the first call builds it in the caller; after
+    that a due version check (and any rebuild) runs on a background thread.
+    """
+    trie = _trie
+    if trie is None:
+        with _lock:
+            if _trie is None:
+                _refresh()
+            return _trie
+    if time.monotonic() - _checked_at >= SUGGEST_VERSION_CHECK_SECONDS and _lock.acquire(blocking=False):
+        threading.Thread(target=_refresh_in_background, name="suggest-refresh", daemon=True).start()
+    return trie
+
+
+def _refresh_in_background():
+    global _checked_at
+    try:
+        _refresh()
+    except Exception as e:
+        logger.error(f"Suggest trie refresh failed: {e}")
+        _checked_at = time.monotonic()   # Retry after the next check interval
+    finally:
+        _lock.release()
+
+
+def _refresh():
+    """Rebuild the trie if the catalog version changed or it is too old. Caller holds _lock."""
+    global _trie, _trie_version, _built_at, _checked_at
+    now = time.monotonic()
+    with SessionLocal() as db:
+        version = catalog_service.current_version(db)
+        if _trie is None or version != _trie_version or now - _built_at > SUGGEST_REFRESH_SECONDS:
+            started = time.perf_counter()
+            trie = build_trie(db)
+            _trie, _trie_version, _built_at = trie, version, now
+            logger.info(
+                f"Suggest trie built for catalog version {version}: {trie.size} keys "
+                f"in {(time.perf_counter() - started) * 1000:.1f} ms"
+            )
+    _checked_at = now
+
+
+def build_trie(db: Session) -> RadixTrie:
+    trie = RadixTrie()
+    matches = analytics_service.scheme_match_counts(db)
+    categories = analytics_service.category_counts(db)
+
+    for scheme_id, name, category in db.query(Scheme.id, Scheme.name, Scheme.category):
+        _add(trie, name, "scheme", _BASE_WEIGHTS["scheme"] + matches.get(scheme_id, 0), scheme_id)
+        if category:
+            categories.setdefault(category, 0)
+    for category, count in categories.items():
+        _add(trie, category, "category", _BASE_WEIGHTS["category"] + count)
+    for keyword in KEYWORD_SYNONYMS:
+        _add(trie, keyword, "topic", _BASE_WEIGHTS["topic"])
+    for actions in PERSONA_QUICK_ACTIONS.values():
+        for action in actions:
+            query = action["query"]
+            _add(trie, query, "query", _BASE_WEIGHTS["query"] + stream_analytics.query_count(query))
+
+    trie.finalize()
+    return trie
+
+
+def _add(trie: RadixTrie, text: str, kind: str, weight: float, scheme_id: Optional[int] = None):
+    """
+    Index the text under its start and under the start of every later word; mid-text
+    matches rank just below texts that start with the prefix.
+    """
+    key = normalize_query(text)
+    trie.insert(key, (weight, text, kind, scheme_id))
+    start = key.find(" ") + 1
+    while start > 0:
+        trie.insert(key[start:], (weight - 0.5, text, kind, scheme_id))
+        start = key.find(" ", start) + 1
+
+
+def _common_prefix(a: str, b: str) -> int:
+    i, n = 0, min(len(a), len(b))
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
@@ -0,0 +1,194 @@
+"""
+TTS Backends — Pluggable text-to-speech engines with per-backend latency metrics.
+
+Backends:
+  gtts    — Google Translate TTS (network, MP3)
+  espeak  — espeak-ng via subprocess (offline, WAV)
+  piper   — Piper neural TTS via subprocess (offline, WAV; needs a voice model per language)
+  stub    — deterministic silent WAV for tests and local development
+
+Selection: TTS_BACKEND sets the default; TTS_BACKEND_<LANG> (e.g. TTS_BACKEND_TA=espeak)
+overrides it for any language in ai_service.LANGUAGE_INSTRUCTIONS.
+"""
+import io
+import os
+import time
+import struct
+import logging
+import threading
+import subprocess
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Dict
+
+from services.ai_service import LANGUAGE_INSTRUCTIONS
+
+logger = logging.getLogger(__name__)
+
+TTS_SUBPROCESS_TIMEOUT = float(os.getenv("TTS_SUBPROCESS_TIMEOUT", "20"))
+# Bump after upgrading a TTS engine or voice so cached audio is regenerated
+TTS_VOICE_VERSION = os.getenv("TTS_VOICE_VERSION", "")
+
+
+class TTSBackend(ABC):
+    """Base class: synthesize(text, lang) returns encoded audio bytes."""
+    name = "base"
+    version = "1"       # Bump when the backend's output changes for the same input
+    extension = ".mp3"
+    media_type = "audio/mpeg"
+
+    @abstractmethod
+    def synthesize(self, text: str, lang: str) -> bytes:
+        """Encode `text` spoken in `lang` as audio in this backend's format."""
+
+    def voice(self, lang: str) -> str:
+        """
+        Identifies the engine and voice that speak `lang`. Part of the audio cache key,
+        so a different voice gets new (immutable) files instead of reusing old ones.
+        """
+        return f"{self.name}:{self.version}:{TTS_VOICE_VERSION}"
+
+
+class GTTSBackend(TTSBackend):
+    name = "gtts"
+
+    def synthesize(self, text: str, lang: str) -> bytes:
+        from gtts import gTTS
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=lang, slow=False).write_to_fp(buffer)
+        return buffer.getvalue()
+
+    def voice(self, lang: str) -> str:
+        return f"{super().voice(lang)}:{_package_version('gTTS')}"
+
+
+class EspeakBackend(TTSBackend):
+    name = "espeak"
+    extension = ".wav"
+    media_type = "audio/wav"
+
+    binary = os.getenv("ESPEAK_BINARY", "espeak-ng")
+
+    def synthesize(self, text: str, lang: str) -> bytes:
+        result = subprocess.run(
+            [self.binary, "-v", lang, "--stdout", text],
+            capture_output=True, timeout=TTS_SUBPROCESS_TIMEOUT, check=True,
+        )
+        return result.stdout
+
+
+class PiperBackend(TTSBackend):
+    name = "piper"
+    extension = ".wav"
+    media_type = "audio/wav"
+
+    binary = os.getenv("PIPER_BINARY", "piper")
+
+    def synthesize(self, text: str, lang: str) -> bytes:
+        model = os.getenv(f"PIPER_MODEL_{lang.upper()}", "")
+        if not model:
+            raise RuntimeError(f"No Piper voice model configured for '{lang}' (PIPER_MODEL_{lang.upper()}).")
+        result = subprocess.run(
+            [self.binary, "--model", model, "--output_file", "-"],
+            input=text.encode("utf-8"), capture_output=True,
+            timeout=TTS_SUBPROCESS_TIMEOUT, check=True,
+        )
+        return result.stdout
+
+    def voice(self, lang: str) -> str:
+        model = os.getenv(f"PIPER_MODEL_{lang.upper()}", "")
+        try:
+            modified = int(os.stat(model).st_mtime) if model else 0
+        except OSError:
+            modified = 0
+        return f"{super().voice(lang)}:{model}:{modified}"
+
+
+class StubBackend(TTSBackend):
+    """Silent 8 kHz mono 8-bit WAV whose length depends only on the text."""
+    name = "stub"
+    version = "2"   # v1 wrote noise instead of silence
+    extension = ".wav"
+    media_type = "audio/wav"
+
+    def synthesize(self, text: str, lang: str) -> bytes:
+        data = b"\x80" * (max(len(text), 1) * 4)  # 8-bit PCM is unsigned: 0x80 is silence
+        header = struct.pack(
+            "<4sI4s4sIHHIIHH4sI",
+            b"RIFF", 36 + len(data), b"WAVE", b"fmt ", 16, 1, 1, 8000, 8000, 1, 8, b"data", len(data),
+        )
+        return header + data
+
+
+BACKENDS: Dict[str, TTSBackend] = {
+    backend.name: backend
+    for backend in (GTTSBackend(), EspeakBackend(), PiperBackend(), StubBackend())
+}
+
+DEFAULT_BACKEND = os.getenv("TTS_BACKEND", "gtts")
+
+# Per-language backend choice, e.g. TTS_BACKEND_HI=espeak
+LANGUAGE_BACKENDS = {
+    lang: os.getenv(f"TTS_BACKEND_{lang.upper()}", DEFAULT_BACKEND)
+    for lang in LANGUAGE_INSTRUCTIONS
+}
+
+_metrics: Dict[str, dict] = {}
+_metrics_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _package_version(package: str) -> str:
+    try:
+        from importlib.metadata import version
+        return version(package)
+    except Exception:
+        return "unknown"
+
+
+def get_backend(lang: str = "en") -> TTSBackend:
+    """Backend configured for a language (falls back to the default, then gTTS)."""
+    name = LANGUAGE_BACKENDS.get(lang, DEFAULT_BACKEND)
+    backend = BACKENDS.get(name)
+    if backend is None:
+        logger.warning(f"Unknown TTS backend '{name}' — using gtts.")
+        backend = BACKENDS["gtts"]
+    return backend
+
+
+def synthesize(text: str, lang: str = "en") -> tuple:
+    """Synthesize with the language's backend, recording latency. Returns (bytes, backend)."""
+    backend = get_backend(lang)
+    started = time.perf_counter()
+    try:
+        audio = backend.synthesize(text, lang)
+    except Exception:
+        _record(backend.name, time.perf_counter() - started, len(text), ok=False)
+        raise
+    _record(backend.name, time.perf_counter() - started, len(text), ok=True)
+    return audio, backend
+
+
+def get_metrics() -> Dict[str, dict]:
+    """Per-backend call counts, errors and latency (ms)."""
+    with _metrics_lock:
+        return {
+            name: {
+                **m,
+                "avg_ms": round(m["total_ms"] / m["calls"], 2) if m["calls"] else 0.0,
+                "total_ms": round(m["total_ms"], 2),
+                "max_ms": round(m["max_ms"], 2),
+            }
+            for name, m in _metrics.items()
+        }
+
+
+def _record(name: str, seconds: float, chars: int, ok: bool):
+    elapsed_ms = seconds * 1000
+    with _metrics_lock:
+        m = _metrics.setdefault(name, {"calls": 0, "errors": 0, "chars": 0, "total_ms": 0.0, "max_ms": 0.0})
+        m["calls"] += 1
+        m["errors"] += 0 if ok else 1
+        m["chars"] += chars
+        m["total_ms"] += elapsed_ms
+        m["max_ms"] = max(m["max_ms"], elapsed_ms)
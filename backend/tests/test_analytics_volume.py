@@ -0,0 +1,72 @@
+"""
+Query-volume bucketing with offset-aware `since`/`until` bounds.
+
+Run from the backend directory:  python -m pytest tests
+"""
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from database import Base  # noqa: E402
+from models import SearchHistory  # noqa: E402
+from services import analytics_service  # noqa: E402
+
+IST = timezone(timedelta(hours=5, minutes=30))
+NOW = datetime(2026, 10, 12, 12, 0)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    # Stored timestamps are naive UTC
+    session.add_all([
+        SearchHistory(query_text="a", persona="Farmer", category="Agriculture", timestamp=datetime(2026, 10, 9, 20, 0)),
+        SearchHistory(query_text="b", persona="Student", category="Education", timestamp=datetime(2026, 10, 9, 22, 0)),
+        SearchHistory(query_text="c", persona="Farmer", category="Agriculture", timestamp=datetime(2026, 10, 10, 1, 0)),
+    ])
+    session.commit()
+    analytics_service._volume_cache.clear()
+    yield session
+    session.close()
+    analytics_service._volume_cache.clear()
+
+
+def test_floor_bucket_converts_aware_values_to_utc():
+    # 03:00 in India is 21:30 UTC on the previous day
+    value = datetime(2026, 10, 10, 3, 0, tzinfo=IST)
+    assert analytics_service.floor_bucket(value, "day") == datetime(2026, 10, 9)
+    assert analytics_service.floor_bucket(value, "hour") == datetime(2026, 10, 9, 21)
+
+
+def test_query_volume_accepts_aware_bounds(db):
+    since = datetime(2026, 10, 10, 0, 0, tzinfo=IST)    # 2026-10-09 18:30 UTC
+    until = datetime(2026, 10, 10, 6, 0, tzinfo=IST)    # 2026-10-10 00:30 UTC
+
+    aware = analytics_service.query_volume(db, "hour", since, until, now=NOW)
+    naive = analytics_service.query_volume(
+        db, "hour", datetime(2026, 10, 9, 18, 30), datetime(2026, 10, 10, 0, 30), now=NOW
+    )
+
+    assert aware == naive
+    assert aware["since"] == datetime(2026, 10, 9, 18)
+    assert aware["until"] == datetime(2026, 10, 10, 1)
+    counts = {b["start"]: b["total"] for b in aware["buckets"] if b["total"]}
+    assert counts == {datetime(2026, 10, 9, 20): 1, datetime(2026, 10, 9, 22): 1}
+
+
+def test_query_volume_day_buckets_with_aware_until(db):
+    result = analytics_service.query_volume(
+        db, "day", until=datetime(2026, 10, 10, 12, 0, tzinfo=IST), now=NOW
+    )
+    counts = {b["start"]: b["total"] for b in result["buckets"] if b["total"]}
+    assert counts == {datetime(2026, 10, 9): 2, datetime(2026, 10, 10): 1}